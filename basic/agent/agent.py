@@ -2,16 +2,24 @@ import os
 import openai
 from dotenv import load_dotenv
 from agent_tools.find_flights import find_flights
-from agent_tools.book_flight import book_flight
+from agent_tools.book_flight import book_flight, book_flights_bulk
+from agent_tools.price_calendar import price_calendar
+from agent_tools.dates import warm_up
+from agent_tools.records import serialize_result
 import json
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 openai.base_url = "http://localhost:10501/v1/"  
 
+# Load the date parser's locale data before the first search
+warm_up()
+
 tools = {
     "find_flights": find_flights,
-    "book_flight": book_flight
+    "book_flight": book_flight,
+    "book_flights_bulk": book_flights_bulk,
+    "price_calendar": price_calendar
 }
 
 function_specs = [
@@ -19,14 +27,16 @@ function_specs = [
         "type": "function",
         "function": {
             "name": "find_flights",
-            "description": "Find mock flights from Los Angeles using IATA airport codes.",
+            "description": "Find mock flights from Los Angeles using IATA airport codes or city names, typos are fine. Returns the cheapest page of flights; pass its next_cursor as cursor to show more. Set max_stops to 1 or 2 to include connecting flights.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "origin": {"type": "string"},
                     "destination": {"type": "string"},
                     "departure_date": {"type": "string"},
-                    "return_date": {"type": "string"}
+                    "return_date": {"type": "string"},
+                    "cursor": {"type": "string"},
+                    "max_stops": {"type": "integer", "description": "0 for direct flights only, up to 2"}
                 },
                 "required": ["origin", "destination", "departure_date", "return_date"]
             }
@@ -36,16 +46,60 @@ function_specs = [
         "type": "function",
         "function": {
             "name": "book_flight",
-            "description": "Book a selected flight using Stripe.",
+            "description": "Book a selected flight using Stripe. Pass the quote_id returned by find_flights so the quoted price is charged.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "flight_id": {"type": "string"},
-                    "price": {"type": "string"}
+                    "price": {"type": "string"},
+                    "quote_id": {"type": "string"}
                 },
                 "required": ["flight_id", "price"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "book_flights_bulk",
+            "description": "Book seats for a group in one call, one item per passenger, usually all on the quote_id of the chosen flight. Returns every booking and every failed item.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "passenger": {"type": "string"},
+                                "quote_id": {"type": "string"},
+                                "flight_id": {"type": "string"},
+                                "price": {"type": "string"}
+                            },
+                            "required": ["passenger"]
+                        }
+                    }
+                },
+                "required": ["items"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "price_calendar",
+            "description": "Find the cheapest departure and return dates in a month for a trip of about trip_length nights, e.g. the cheapest week in June. Use find_flights on the chosen dates to get bookable flights.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "origin": {"type": "string"},
+                    "destination": {"type": "string"},
+                    "month": {"type": "string", "description": "Month name or YYYY-MM"},
+                    "trip_length": {"type": "integer", "description": "Nights at the destination"}
+                },
+                "required": ["origin", "destination", "month", "trip_length"]
+            }
+        }
     }
 ]
 
@@ -84,7 +138,7 @@ def handle_message(message, history):
                 "role": "tool",
                 "tool_call_id": tool_call.id,
                 "name": tool_name,
-                "content": json.dumps(result)
+                "content": serialize_result(result)
             })
             second_response = call_openai(messages)
             return second_response.choices[0].message.content
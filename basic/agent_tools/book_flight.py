@@ -1,34 +1,50 @@
-import stripe
-import os
+from typing import Any, Dict, List
 from dotenv import load_dotenv
+from agent_tools.booking import LOCAL_SESSION, get_booking_service
+from agent_tools.bulk_booking import book_flights_bulk as book_group
+from agent_tools.quotes import charge_amount
+from agent_tools.seats import SEAT_LOST, confirm_seats, hold_seats, release_seats
 
-# Load environment variables
+# Load environment variables, STRIPE_API_KEY is read by agent_tools.booking
 load_dotenv(override=True)
 
-stripe.api_key = os.getenv("STRIPE_API_KEY")
-
-def book_flight(flight_id: str, price: str):
+def book_flight(flight_id: str, price: str, quote_id: str = ""):
     print(f"Booking flight {flight_id} for {price}...")
 
-    try:
-        amount = int(float(price.replace('$', '')) * 100)
-    except ValueError as ve:
-        print("Price parsing error:", ve)
-        return {"error": "Invalid price format."}
+    amount, error = charge_amount(price, quote_id)
+    if error:
+        print("Price check failed:", error)
+        return {"error": error}
+
+    # Hold the seat while charging, so no other session sells it meanwhile
+    hold_id, error = hold_seats(quote_id, LOCAL_SESSION)
+    if error:
+        print("Seat hold failed:", error)
+        return {"error": error}
 
     try:
-        customer = stripe.Customer.create(source="tok_visa")
-        charge = stripe.Charge.create(
-            amount=amount,
-            currency='usd',
-            description=f"Flight booking for {flight_id}",
-            customer=customer.id
-        )
+        # One Stripe request, none when this quote was already booked
+        charge = get_booking_service().book(flight_id, amount, quote_id, session_id=LOCAL_SESSION)
         print("Stripe charge succeeded:", charge['receipt_url'])
-        return {
-            "invoice_url": charge['receipt_url']
-        }
-
     except Exception as e:
+        release_seats(hold_id)
         print("Stripe error:", e)
-        return {"error": f"Stripe error: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Stripe error: {str(e)}"}
+
+    result = {
+        "invoice_url": charge['receipt_url']
+    }
+    if not confirm_seats(hold_id):
+        result["warning"] = SEAT_LOST
+    return result
+
+def book_flights_bulk(items: List[Dict[str, Any]]):
+    print(f"Booking {len(items)} seats...")
+
+    # One call for the whole group, charged a few at a time
+    result = book_group(items, session_id=LOCAL_SESSION)
+    if "error" in result:
+        print("Bulk booking failed:", result["error"])
+    else:
+        print(f"Booked {result['booked']} seats for {result['charged']}, {result['failed']} failed")
+    return result
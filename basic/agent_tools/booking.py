@@ -0,0 +1,253 @@
+import hashlib
+import os
+import ssl
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import requests
+import stripe
+from requests.adapters import HTTPAdapter
+
+# Stripe bookings for book_flight.
+#
+# A session (one chat) gets a Stripe customer the first time it books, and
+# later bookings charge that customer directly, one request each. Without a
+# session (a Temporal workflow books once) the test card is charged
+# directly, also in one request. Every request carries an idempotency key
+# derived from the session and the quote (or flight and amount), so an
+# activity retry or a repeated tool call returns the original charge instead
+# of charging again. Completed bookings are also remembered in-process, so a
+# repeat does not reach Stripe at all.
+#
+# Requests go through one explicitly configured StripeClient instead of the
+# SDK's global client: a pooled requests.Session for blocking calls, and a
+# pooled httpx.AsyncClient for book_async, keeping up to STRIPE_POOL_SIZE
+# and STRIPE_ASYNC_POOL_SIZE connections alive. The async pool is smaller:
+# httpx scans every connection for each queued request, so one event loop
+# books faster over 8 connections than over 32. Failed requests are retried
+# STRIPE_MAX_RETRIES times with the SDK's exponential backoff (0.5s doubling
+# up to 5s, with jitter), which is safe because of the idempotency keys.
+
+PAYMENT_SOURCE = os.getenv("STRIPE_PAYMENT_SOURCE", "tok_visa")
+CACHE_SIZE = int(os.getenv("BOOKING_CACHE_SIZE", "10000"))
+POOL_SIZE = int(os.getenv("STRIPE_POOL_SIZE", "32"))
+ASYNC_POOL_SIZE = int(os.getenv("STRIPE_ASYNC_POOL_SIZE", "8"))
+KEEPALIVE_SECONDS = float(os.getenv("STRIPE_KEEPALIVE_SECONDS", "60"))
+CONNECT_TIMEOUT = float(os.getenv("STRIPE_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("STRIPE_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("STRIPE_MAX_RETRIES", "2"))
+# The chat of a single-user agent process. Random per process, so a booking
+# after a restart never collides with an earlier idempotency key
+LOCAL_SESSION = f"local-{uuid.uuid4().hex}"
+
+class PooledHTTPXClient(stripe.HTTPXClient):
+    """The SDK's httpx client with connection pool limits and keep-alive set."""
+
+    def __init__(self, pool_size: int = ASYNC_POOL_SIZE, **kwargs: Any):
+        super().__init__(**kwargs)
+        # The SDK builds its AsyncClient without limits, replace it
+        verify = ssl.create_default_context(cafile=stripe.ca_bundle_path) if self._verify_ssl_certs else False
+        self._client_async = httpx.AsyncClient(
+            verify=verify,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=KEEPALIVE_SECONDS,
+            ),
+        )
+
+def pooled_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """A requests session keeping up to pool_size connections per host alive."""
+    session = requests.Session()
+    # Retries are left to the Stripe client, which knows what is safe to retry
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def stripe_client(
+    api_key: Optional[str] = None,
+    api_base: Optional[str] = None,
+    pool_size: int = POOL_SIZE,
+    async_pool_size: int = ASYNC_POOL_SIZE,
+    max_retries: int = MAX_RETRIES,
+) -> stripe.StripeClient:
+    """A StripeClient with pooled sync and async HTTP clients.
+
+    api_base defaults to STRIPE_API_BASE, e.g. benchmarks/stripe_stub.py,
+    and to Stripe's API without it.
+    """
+    api_base = api_base or os.getenv("STRIPE_API_BASE")
+    http_client = stripe.RequestsClient(
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        session=pooled_session(pool_size),
+        async_fallback_client=PooledHTTPXClient(
+            async_pool_size, timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+        ),
+    )
+    return stripe.StripeClient(
+        api_key or os.getenv("STRIPE_API_KEY") or "",
+        base_addresses={"api": api_base} if api_base else {},
+        max_network_retries=max_retries,
+        http_client=http_client,
+    )
+
+def booking_key(session_id: str, flight_id: str, quote_id: str, amount: int, passenger: str = "") -> str:
+    """Idempotency key of a booking: the same session and quote give the same key.
+
+    A passenger gets a key of their own, so a group can book one quote once
+    per passenger.
+    """
+    parts = [session_id, quote_id or f"{flight_id}|{amount}"]
+    if passenger:
+        parts.append(passenger)
+    raw = "|".join(parts)
+    return "booking-" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+class BookingService:
+    """Charges with per-session customers and idempotency keys."""
+
+    def __init__(
+        self,
+        client: Optional[stripe.StripeClient] = None,
+        max_size: int = CACHE_SIZE,
+        payment_source: str = PAYMENT_SOURCE,
+    ):
+        self.client = client or stripe_client()
+        self.max_size = max_size
+        self.payment_source = payment_source
+        self._lock = threading.Lock()
+        self._customers: "OrderedDict[str, str]" = OrderedDict()
+        self._charges: "OrderedDict[str, Any]" = OrderedDict()
+        self._stats = {"requests": 0, "customers": 0, "repeats": 0}
+
+    def customer_for(self, session_id: str) -> str:
+        """The session's customer id, created on its first booking."""
+        customer_id = self._cached_customer(session_id)
+        if customer_id is None:
+            customer = self.client.customers.create(*self._customer_request(session_id))
+            customer_id = self._record_customer(session_id, customer.id)
+        return customer_id
+
+    async def customer_for_async(self, session_id: str) -> str:
+        customer_id = self._cached_customer(session_id)
+        if customer_id is None:
+            customer = await self.client.customers.create_async(*self._customer_request(session_id))
+            customer_id = self._record_customer(session_id, customer.id)
+        return customer_id
+
+    def book(
+        self,
+        flight_id: str,
+        amount: int,
+        quote_id: str = "",
+        session_id: str = "",
+        idempotency_key: Optional[str] = None,
+        passenger: str = "",
+    ) -> Any:
+        """Charge amount cents for a flight and return the Stripe charge.
+
+        Raises the Stripe error if the charge fails; a failed booking can be
+        retried with the same key.
+        """
+        key = idempotency_key or booking_key(session_id, flight_id, quote_id, amount, passenger)
+        charge = self._cached_charge(key)
+        if charge is None:
+            customer_id = self.customer_for(session_id) if session_id else None
+            charge = self.client.charges.create(
+                *self._charge_request(flight_id, amount, quote_id, customer_id, key, passenger)
+            )
+            self._record_charge(key, charge)
+        return charge
+
+    async def book_async(
+        self,
+        flight_id: str,
+        amount: int,
+        quote_id: str = "",
+        session_id: str = "",
+        idempotency_key: Optional[str] = None,
+        passenger: str = "",
+    ) -> Any:
+        """book() for event loops, on the pooled async HTTP client."""
+        key = idempotency_key or booking_key(session_id, flight_id, quote_id, amount, passenger)
+        charge = self._cached_charge(key)
+        if charge is None:
+            customer_id = await self.customer_for_async(session_id) if session_id else None
+            charge = await self.client.charges.create_async(
+                *self._charge_request(flight_id, amount, quote_id, customer_id, key, passenger)
+            )
+            self._record_charge(key, charge)
+        return charge
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "sessions": len(self._customers), "bookings": len(self._charges)}
+
+    def _customer_request(self, session_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        key = "customer-" + hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+        return {"source": self.payment_source}, {"idempotency_key": key}
+
+    def _charge_request(
+        self,
+        flight_id: str,
+        amount: int,
+        quote_id: str,
+        customer_id: Optional[str],
+        key: str,
+        passenger: str = "",
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        params: Dict[str, Any] = {
+            "amount": amount,
+            "currency": "usd",
+            "description": f"Flight booking for {flight_id}" + (f" ({passenger})" if passenger else ""),
+            "metadata": {"flight_id": flight_id, "quote_id": quote_id},
+        }
+        if passenger:
+            params["metadata"]["passenger"] = passenger
+        if customer_id:
+            params["customer"] = customer_id
+        else:
+            params["source"] = self.payment_source
+        return params, {"idempotency_key": key}
+
+    def _cached_customer(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            customer_id = self._customers.get(session_id)
+            if customer_id is not None:
+                self._customers.move_to_end(session_id)
+            return customer_id
+
+    def _record_customer(self, session_id: str, customer_id: str) -> str:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["customers"] += 1
+            self._remember(self._customers, session_id, customer_id)
+        return customer_id
+
+    def _cached_charge(self, key: str) -> Any:
+        with self._lock:
+            charge = self._charges.get(key)
+            if charge is not None:
+                self._stats["repeats"] += 1
+            return charge
+
+    def _record_charge(self, key: str, charge: Any) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._remember(self._charges, key, charge)
+
+    def _remember(self, cache: "OrderedDict[str, Any]", key: str, value: Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_size:
+            cache.popitem(last=False)
+
+@lru_cache(maxsize=1)
+def get_booking_service() -> BookingService:
+    """The process-wide booking service, created on the first booking."""
+    return BookingService()
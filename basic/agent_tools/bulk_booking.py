@@ -0,0 +1,222 @@
+import asyncio
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from agent_tools.booking import BookingService, booking_key, get_booking_service
+from agent_tools.quotes import charge_amount
+from agent_tools.seats import SEAT_LOST, confirm_seats, hold_seats, release_seats
+
+# Group bookings: many (quote, passenger) items in one tool call instead of
+# one LLM turn per seat.
+#
+# Every item is priced first (charge_amount, no Stripe request), then
+# charged by BULK_BOOKING_CONCURRENCY workers, each holding the passenger's
+# seat before its charge and confirming it after (agent_tools.seats).
+# Priced items wait in a queue of twice that size, so pricing blocks as
+# soon as it is two batches ahead of the workers (backpressure) and a large
+# group never has more than a few charges in flight. A failed item does not
+# stop the others: the result lists every booking and every error by item
+# number. Each item has an idempotency key of its own (scope, quote,
+# passenger), so running the same group again, e.g. a retried Temporal
+# activity, charges nobody twice.
+
+CONCURRENCY = int(os.getenv("BULK_BOOKING_CONCURRENCY", "8"))
+MAX_ITEMS = int(os.getenv("BULK_BOOKING_MAX_ITEMS", "1000"))
+
+Progress = Callable[[int, int], None]
+
+@dataclass(frozen=True)
+class BulkOrder:
+    """A priced item, ready to charge."""
+    item: int
+    flight_id: str
+    quote_id: str
+    passenger: str
+    amount: int
+    key: str
+    # Seat holder, one per passenger
+    holder: str
+
+def check_items(items: Sequence[Dict[str, Any]]) -> Optional[str]:
+    if not items:
+        return "Give at least one item with a passenger and a quote_id."
+    if len(items) > MAX_ITEMS:
+        return f"At most {MAX_ITEMS} items per bulk booking."
+    return None
+
+def price_items(
+    items: Sequence[Dict[str, Any]], session_id: str = "", key_scope: str = ""
+) -> List[Union[BulkOrder, Dict[str, Any]]]:
+    """A BulkOrder for every bookable item, an error entry for the others."""
+    seen = set()
+    priced: List[Union[BulkOrder, Dict[str, Any]]] = []
+    for item, entry in enumerate(items, start=1):
+        flight_id = str(entry.get("flight_id", ""))
+        quote_id = str(entry.get("quote_id", ""))
+        passenger = str(entry.get("passenger", "")).strip()
+        amount, error = charge_amount(str(entry.get("price", "")), quote_id)
+        if not passenger:
+            error = "Every item needs a passenger."
+        if error:
+            priced.append({"item": item, "passenger": passenger, "error": error})
+            continue
+        key = booking_key(key_scope or session_id, flight_id, quote_id, amount, passenger)
+        if key in seen:
+            priced.append({"item": item, "passenger": passenger, "error": "Duplicate of an earlier item."})
+            continue
+        seen.add(key)
+        holder = f"{key_scope or session_id}|{passenger}"
+        priced.append(BulkOrder(item, flight_id, quote_id, passenger, amount, key, holder))
+    return priced
+
+def book_flights_bulk(
+    items: Sequence[Dict[str, Any]],
+    session_id: str = "",
+    key_scope: str = "",
+    concurrency: int = CONCURRENCY,
+    service: Optional[BookingService] = None,
+    progress: Optional[Progress] = None,
+) -> Dict[str, Any]:
+    """Book every (quote, passenger) item on a bounded thread pool.
+
+    items are dicts with passenger and quote_id, or flight_id and price.
+    session_id charges the session's customer as book_flight does;
+    key_scope (default session_id) scopes the idempotency keys.
+    """
+    error = check_items(items)
+    if error:
+        return {"error": error}
+    service = service or get_booking_service()
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    workers = max(1, min(concurrency, len(items)))
+    pending: "queue.Queue[Optional[BulkOrder]]" = queue.Queue(maxsize=2 * workers)
+
+    def finish(result: Dict[str, Any]) -> None:
+        with lock:
+            results.append(result)
+            done = len(results)
+        if progress:
+            progress(done, len(items))
+
+    def work() -> None:
+        while (order := pending.get()) is not None:
+            hold_id, error = hold_seats(order.quote_id, order.holder)
+            if error:
+                finish({"item": order.item, "passenger": order.passenger, "error": error})
+                continue
+            try:
+                charge = service.book(
+                    order.flight_id, order.amount, order.quote_id, session_id,
+                    idempotency_key=order.key, passenger=order.passenger,
+                )
+            except Exception as e:
+                release_seats(hold_id)
+                finish(_failed(order, e))
+                continue
+            finish(_booked(order, charge, confirm_seats(hold_id)))
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for order in price_items(items, session_id, key_scope):
+            if isinstance(order, BulkOrder):
+                # Blocks while the workers are behind
+                pending.put(order)
+            else:
+                finish(order)
+    finally:
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+    return summarize(results)
+
+async def book_flights_bulk_async(
+    items: Sequence[Dict[str, Any]],
+    session_id: str = "",
+    key_scope: str = "",
+    concurrency: int = CONCURRENCY,
+    service: Optional[BookingService] = None,
+    progress: Optional[Progress] = None,
+) -> Dict[str, Any]:
+    """book_flights_bulk for event loops, with worker tasks on book_async."""
+    error = check_items(items)
+    if error:
+        return {"error": error}
+    service = service or get_booking_service()
+    results: List[Dict[str, Any]] = []
+    workers = max(1, min(concurrency, len(items)))
+    pending: "asyncio.Queue[Optional[BulkOrder]]" = asyncio.Queue(maxsize=2 * workers)
+
+    def finish(result: Dict[str, Any]) -> None:
+        results.append(result)
+        if progress:
+            progress(len(results), len(items))
+
+    async def work() -> None:
+        while (order := await pending.get()) is not None:
+            hold_id, error = hold_seats(order.quote_id, order.holder)
+            if error:
+                finish({"item": order.item, "passenger": order.passenger, "error": error})
+                continue
+            try:
+                charge = await service.book_async(
+                    order.flight_id, order.amount, order.quote_id, session_id,
+                    idempotency_key=order.key, passenger=order.passenger,
+                )
+            except Exception as e:
+                release_seats(hold_id)
+                finish(_failed(order, e))
+                continue
+            finish(_booked(order, charge, confirm_seats(hold_id)))
+
+    tasks = [asyncio.create_task(work()) for _ in range(workers)]
+    try:
+        for order in price_items(items, session_id, key_scope):
+            if isinstance(order, BulkOrder):
+                await pending.put(order)
+            else:
+                finish(order)
+        for _ in tasks:
+            await pending.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        # Cancelled, e.g. a Temporal activity timing out: stop the workers too
+        for task in tasks:
+            task.cancel()
+    return summarize(results)
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One result for the whole group, bookings and errors in item order."""
+    results.sort(key=lambda r: r["item"])
+    bookings = [r for r in results if "error" not in r]
+    errors = [r for r in results if "error" in r]
+    return {
+        "status": "success" if not errors else "partial" if bookings else "error",
+        "booked": len(bookings),
+        "failed": len(errors),
+        "charged": f"{sum(r['amount'] for r in bookings) / 100:.2f}",
+        "bookings": [{k: v for k, v in r.items() if k != "amount"} for r in bookings],
+        "errors": errors,
+    }
+
+def _booked(order: BulkOrder, charge: Any, seated: bool = True) -> Dict[str, Any]:
+    booked = {
+        "item": order.item,
+        "passenger": order.passenger,
+        "flight_id": order.flight_id,
+        "quote_id": order.quote_id,
+        "amount": order.amount,
+        "invoice_url": charge["receipt_url"],
+    }
+    if not seated:
+        booked["warning"] = SEAT_LOST
+    return booked
+
+def _failed(order: BulkOrder, error: Exception) -> Dict[str, Any]:
+    return {"item": order.item, "passenger": order.passenger, "error": f"Stripe error: {error}"}
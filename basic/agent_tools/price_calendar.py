@@ -0,0 +1,145 @@
+import calendar
+import datetime
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from agent_tools.airports import resolve_airport
+from agent_tools.dates import MONTHS, parse_date
+from agent_tools.fare_generator import get_fare_generator
+from agent_tools.fares import EPOCH, from_day, get_fare_inventory
+from agent_tools.routes import get_route_index
+
+# Flexible-date price calendar.
+#
+# One call prices every departure day of a month against trip lengths of
+# trip_length +/- FLEX_DAYS nights: the route's block of the fare inventory is
+# reduced to a (departure day x trip length) matrix of cheapest fares in a
+# single vectorized pass, and the cheapest cells are returned. Without a fare
+# inventory every cell is the cheapest fare the fare generator gives
+# find_flights for those dates, so the calendar quotes bookable prices
+# (indicative ones with FARE_GENERATOR=random, which reprices every search).
+
+FLEX_DAYS = 2
+TOP_CELLS = 5
+NO_FARE = np.iinfo(np.int64).max
+
+_YEAR_MONTH = re.compile(r"^(\d{4})[-/](\d{1,2})$")
+
+def parse_month(text: str, today: datetime.date) -> Optional[Tuple[int, int]]:
+    """(year, month) for "June", "June 2026", "2026-06" or any date, preferring the future."""
+    text = " ".join(str(text).strip().lower().replace(",", " ").split())
+    m = _YEAR_MONTH.match(text)
+    if m:
+        return (int(m.group(1)), int(m.group(2))) if 1 <= int(m.group(2)) <= 12 else None
+    words = text.split()
+    names = [w.rstrip(".") for w in words if w.rstrip(".") in MONTHS]
+    if names:
+        month = MONTHS[names[0]]
+        years = [int(w) for w in words if w.isdigit() and len(w) == 4]
+        if years:
+            return years[0], month
+        return (today.year if month >= today.month else today.year + 1), month
+    day = parse_date(text)
+    if not day:
+        return None
+    day = datetime.date.fromisoformat(day)
+    return day.year, day.month
+
+def price_matrix(origin: str, destination: str, first_day: int, last_day: int, lengths: np.ndarray) -> np.ndarray:
+    """Cheapest fare in cents per (departure day, trip length), NO_FARE where there is none."""
+    matrix = np.full((last_day - first_day + 1, len(lengths)), NO_FARE, dtype=np.int64)
+    inventory = get_fare_inventory()
+    if inventory is None:
+        return _generated_matrix(origin, destination, first_day, lengths, matrix)
+    route_id = inventory.route_id(origin, destination)
+    if route_id is None:
+        return matrix
+    lo, hi = inventory.route_block(route_id, first_day, last_day)
+    departs = inventory.columns["depart_day"][lo:hi]
+    nights = inventory.columns["return_day"][lo:hi] - departs
+    prices = inventory.columns["price_cents"][lo:hi]
+    mask = (inventory.columns["seats"][lo:hi] > 0) & (nights >= lengths[0]) & (nights <= lengths[-1])
+    np.minimum.at(matrix, (departs[mask] - first_day, nights[mask] - lengths[0]), prices[mask].astype(np.int64))
+    return matrix
+
+def _generated_matrix(origin: str, destination: str, first_day: int, lengths: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """The fare generator's cheapest fare per cell, as find_flights would quote it."""
+    generator = get_fare_generator()
+    for day in range(matrix.shape[0]):
+        depart = from_day(first_day + day)
+        for column, nights in enumerate(lengths):
+            ret = from_day(first_day + day + int(nights))
+            price = generator.cheapest(origin, destination, depart, ret)
+            if price is not None:
+                matrix[day, column] = round(float(price) * 100)
+    return matrix
+
+def price_calendar(
+    origin: str,
+    destination: str,
+    month: str,
+    trip_length: int,
+    flex_days: int = FLEX_DAYS,
+    top: int = TOP_CELLS,
+) -> Dict[str, Any]:
+    """Cheapest departure/return date pairs in a month for a trip of about trip_length nights."""
+    origin_code = resolve_airport(origin)
+    destination_code = resolve_airport(destination)
+    routes = get_route_index()
+    if not routes.is_valid(origin_code, destination_code):
+        return {
+            "error": f"No direct route from {origin_code} to {destination_code}.",
+            "supported_destinations": list(routes.destinations_from(origin_code) or routes.destinations_from("LAX"))
+        }
+    try:
+        trip_length = int(trip_length)
+    except (TypeError, ValueError):
+        return {"error": "Trip length must be a number of nights."}
+    if trip_length < 1:
+        return {"error": "Trip length must be at least one night."}
+
+    today = datetime.date.today()
+    year_month = parse_month(month, today)
+    if year_month is None:
+        return {"error": "Could not parse the month."}
+    year, month_number = year_month
+    start = max(datetime.date(year, month_number, 1), today)
+    end = datetime.date(year, month_number, calendar.monthrange(year, month_number)[1])
+    if start > end:
+        return {"error": "That month is in the past."}
+
+    lengths = np.arange(max(1, trip_length - flex_days), trip_length + flex_days + 1)
+    first_day, last_day = (start - EPOCH).days, (end - EPOCH).days
+    matrix = price_matrix(origin_code, destination_code, first_day, last_day, lengths)
+
+    flat = matrix.ravel()
+    cells = np.flatnonzero(flat != NO_FARE)
+    if not len(cells):
+        return {"error": "No fares available that month."}
+    if len(cells) > top:
+        cells = cells[np.argpartition(flat[cells], top - 1)[:top]]
+    cells = cells[np.argsort(flat[cells], kind="stable")]
+
+    best = []
+    for cell in cells:
+        day, length = divmod(int(cell), len(lengths))
+        depart = first_day + day
+        best.append({
+            "departure_date": from_day(depart),
+            "return_date": from_day(depart + lengths[length]),
+            "nights": int(lengths[length]),
+            "price": f"{flat[cell] / 100:.2f}",
+            "currency": "USD",
+        })
+    result = {
+        "origin": origin_code,
+        "destination": destination_code,
+        "month": f"{year}-{month_number:02d}",
+        "nights": [int(n) for n in lengths],
+        "cheapest": best,
+    }
+    if get_fare_inventory() is None and not get_fare_generator().repeatable:
+        result["note"] = "Indicative prices: every search is priced anew, find_flights will differ."
+    return result
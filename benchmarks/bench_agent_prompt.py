@@ -0,0 +1,88 @@
+"""Per-call CPU overhead of run_agent before the LLM request is sent.
+
+"rebuild" replays the old run_agent setup: map the history, build a new
+ChatPromptTemplate, call create_tool_calling_agent and format the prompt.
+"prebuilt" uses the agent compiled once by build_agent(): map the history and
+format the shared prompt. The LLM call itself is identical in both and skipped.
+
+    poetry run python benchmarks/bench_agent_prompt.py
+"""
+import argparse
+import time
+
+import temporal_stubs  # noqa: F401  puts temporal/ on the path with a dummy API key
+from langchain.agents import create_tool_calling_agent
+from langchain_core.prompts import ChatPromptTemplate
+
+from activities import PROMPT, SYSTEM_PROMPT, TOOLS, build_agent, llm, to_messages
+
+
+def make_history(events: int) -> list[dict]:
+    flights = [
+        {"id": str(i), "origin": "LAX", "destination": "NYC", "departure_date": "2026-06-01",
+         "return_date": "2026-06-08", "price": f"{300 + i:.2f}", "currency": "USD"}
+        for i in range(1, 4)
+    ]
+    history = []
+    while len(history) < events:
+        history += [
+            {"actor": "user", "message": "Find me flights to New York from June 1 to June 8"},
+            {"actor": "tool", "message": flights},
+            {"actor": "llm", "message": "I found three flights, which one would you like?"},
+        ]
+    history = history[:events - 1] + [{"actor": "user", "message": "Book flight 1"}]
+    return history
+
+
+def rebuild(history: list[dict]):
+    last_input = history[-1]["message"]
+    mapped = []
+    for msg in history:
+        content = msg.get("message")
+        if msg.get("actor") == "user":
+            mapped.append(("user", content))
+        elif msg.get("actor") == "llm":
+            mapped.append(("assistant", content))
+        elif msg.get("actor") == "tool":
+            c = str(content).replace("{", "").replace("}", "")
+            mapped.append(("assistant", f"Observation: {c}"))
+    prompt = ChatPromptTemplate.from_messages(
+        [("system", SYSTEM_PROMPT)] + mapped
+        + [("user", last_input), ("placeholder", "{agent_scratchpad}")]
+    )
+    create_tool_calling_agent(llm=llm, tools=TOOLS, prompt=prompt)
+    return prompt.invoke({"input": last_input, "agent_scratchpad": []})
+
+
+def prebuilt(history: list[dict]):
+    build_agent()
+    return PROMPT.invoke({
+        "history": to_messages(history),
+        "input": history[-1]["message"],
+        "agent_scratchpad": [],
+    })
+
+
+def measure(fn, history: list[dict], iterations: int) -> float:
+    fn(history)
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(history)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'events':>7} {'rebuild us':>12} {'prebuilt us':>12} {'speedup':>8}")
+    for events in (4, 20, 100):
+        history = make_history(events)
+        old = measure(rebuild, history, args.iterations)
+        new = measure(prebuilt, history, args.iterations)
+        print(f"{events:>7} {old:>12.0f} {new:>12.0f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""City-to-IATA resolution latency, exact names versus prefixes and typos.
+
+Times AirportResolver.lookup (uncached) on the bundled airport list and on
+a synthetic list of --airports generated names, for exact city names,
+prefixes and names with one typo (dropped, swapped or replaced letter).
+"resolved" is the share of queries that came back with the intended code.
+
+    poetry run python benchmarks/bench_airports.py
+"""
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.airports import AIRPORTS_FILE, AirportResolver
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(("drop", "swap", "replace"))
+    if kind == "drop":
+        return name[:i] + name[i + 1:]
+    if kind == "swap":
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+
+def synthetic_airports(n: int, seed: int = 3) -> list[tuple[str, str, list[str]]]:
+    rng = random.Random(seed)
+    airports, cities = [], set()
+    while len(airports) < n:
+        city = "".join(rng.choice("bcdfghklmnprstvwz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+        city = (city + rng.choice(("", "n", "r", "s", "burg", "ton", "ville"))).capitalize()
+        if city in cities:
+            continue
+        cities.add(city)
+        i = len(airports)
+        code = f"{chr(65 + i // 676 % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}"
+        airports.append((code, city, [f"{city} International"]))
+    return airports
+
+
+def timed_us(resolver: AirportResolver, queries: list[tuple[str, str]]) -> tuple[float, float, float]:
+    samples, hits = [], 0
+    for text, expected in queries:
+        start = time.perf_counter()
+        code = resolver.lookup(text)
+        samples.append((time.perf_counter() - start) * 1e6)
+        hits += code == expected
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)], hits / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--airports", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    bundled = AirportResolver.from_file(AIRPORTS_FILE)
+    # Only single-airport cities, so every query has one right answer
+    with open(AIRPORTS_FILE, encoding="utf-8") as f:
+        rows = [line.split(",")[:2] for line in f.read().splitlines()[1:]]
+    per_city: dict[str, list[str]] = {}
+    for code, city in rows:
+        per_city.setdefault(city, []).append(code)
+    bundled_cities = [(city, codes[0]) for city, codes in per_city.items() if len(codes) == 1]
+    synthetic = synthetic_airports(args.airports)
+
+    print(f"{'airports':>8} {'query':>7} {'p50 us':>7} {'p99 us':>7} {'resolved':>8}")
+    for resolver, cities in (
+        (bundled, bundled_cities),
+        (AirportResolver(synthetic), [(city, code) for code, city, _ in synthetic]),
+    ):
+        rng = random.Random(len(resolver))
+        sample = [rng.choice(cities) for _ in range(args.queries)]
+        for kind, queries in (
+            ("exact", sample),
+            ("prefix", [(city[:max(4, len(city) * 3 // 4)], code) for city, code in sample]),
+            ("typo", [(typo(city.lower(), rng), code) for city, code in sample]),
+        ):
+            p50, p99, resolved = timed_us(resolver, queries)
+            print(f"{len(resolver):>8,} {kind:>7} {p50:>7.1f} {p99:>7.1f} {resolved:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""book_flight throughput of every framework against the local Stripe stub.
+
+Starts stripe_stub.py with --latency, --jitter and --error-rate, points the
+tools at it with STRIPE_API_BASE, and books --bookings flights at each
+concurrency level through each framework's own agent_tools: basic,
+langgraph and crewai on a thread pool, the OpenAI agent's
+book_flight_async and the Temporal book_flight activity (in an
+ActivityEnvironment) on one event loop. "failed" counts bookings that
+came back with an error after the SDK's retries, "injected" the stub
+errors behind them, and "replayed" the requests the stub answered from an
+idempotency key (first bookings racing to create the session's customer).
+
+    poetry run python benchmarks/bench_book_flight.py --latency 50 --jitter 25 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bench_booking import start_stub, stub_stats
+
+ROOT = Path(__file__).resolve().parent.parent
+FRAMEWORKS = ("basic", "langgraph", "crewai", "openai", "temporal")
+
+
+def load_book_flight(framework: str):
+    """The framework's book_flight, imported from its own agent_tools."""
+    # Every framework has a top-level agent_tools, only one can be imported at a time
+    for name in [m for m in sys.modules if m.split(".")[0] in ("agent_tools", "activities", "metrics")]:
+        del sys.modules[name]
+    sys.path.insert(0, str(ROOT / framework))
+    try:
+        if framework == "temporal":
+            from temporalio.testing import ActivityEnvironment
+
+            book_flight = importlib.import_module("activities").book_flight
+            return lambda *args: ActivityEnvironment().run(book_flight, *args)
+        module = importlib.import_module("agent_tools.book_flight")
+        return module.book_flight_async if framework == "openai" else module.book_flight
+    finally:
+        sys.path.remove(str(ROOT / framework))
+
+
+def failed(result) -> bool:
+    return "error" in result or result.get("status") == "error"
+
+
+def run_threads(book, run: str, bookings: int, concurrency: int) -> list[tuple[float, bool]]:
+    def timed(i: int) -> tuple[float, bool]:
+        start = time.perf_counter()
+        result = book(f"{run}-{i}", "350.00")
+        return (time.perf_counter() - start) * 1000, failed(result)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(timed, range(bookings)))
+
+
+async def run_async(book, run: str, bookings: int, concurrency: int) -> list[tuple[float, bool]]:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int) -> tuple[float, bool]:
+        async with gate:
+            start = time.perf_counter()
+            result = await book(f"{run}-{i}", "350.00")
+            return (time.perf_counter() - start) * 1000, failed(result)
+
+    return await asyncio.gather(*(timed(i) for i in range(bookings)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--frameworks", default=",".join(FRAMEWORKS))
+    parser.add_argument("--latency", default="50", help="stub ms per request")
+    parser.add_argument("--jitter", default="25")
+    parser.add_argument("--error-rate", default="0.02")
+    args = parser.parse_args()
+
+    stub, url = start_stub("--latency", args.latency, "--jitter", args.jitter, "--error-rate", args.error_rate)
+    os.environ.update(STRIPE_API_BASE=url, STRIPE_API_KEY="sk_test_stub", OPENAI_API_KEY="sk-unused")
+    try:
+        print(f"{'framework':>9} {'conc':>5} {'bookings/s':>10} {'p50 ms':>7} {'p99 ms':>8} "
+              f"{'failed':>6} {'injected':>8} {'requests':>8} {'replayed':>8}")
+        for framework in args.frameworks.split(","):
+            book = load_book_flight(framework)
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                run = f"{framework}-{concurrency}"
+                before = stub_stats(url)
+                start = time.perf_counter()
+                # The tools print every booking
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if framework in ("openai", "temporal"):
+                        samples = asyncio.run(run_async(book, run, args.bookings, concurrency))
+                    else:
+                        samples = run_threads(book, run, args.bookings, concurrency)
+                elapsed = time.perf_counter() - start
+                after = stub_stats(url)
+                latencies = sorted(ms for ms, _ in samples)
+                print(f"{framework:>9} {concurrency:>5} {args.bookings / elapsed:>10.0f} "
+                      f"{statistics.median(latencies):>7.1f} {latencies[int(len(latencies) * 0.99)]:>8.1f} "
+                      f"{sum(error for _, error in samples):>6} {after['errors'] - before['errors']:>8} "
+                      f"{after['requests'] - before['requests']:>8} {after['replayed'] - before['replayed']:>8}")
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
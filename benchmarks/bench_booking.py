@@ -0,0 +1,106 @@
+"""Concurrent booking throughput against a local Stripe stub.
+
+Starts stripe_stub.py in a subprocess and books --bookings flights at each
+concurrency level three ways: the SDK's global client with a new customer
+and a charge per booking (book_flight before the booking service), the
+booking service's pooled client on a thread pool, and book_async on one
+event loop (over STRIPE_ASYNC_POOL_SIZE connections). "conns" is the TCP
+connections the stub accepted per run.
+
+    poetry run python benchmarks/bench_booking.py --concurrency 1,8,32,64
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "basic"))
+
+import stripe
+
+from agent_tools.booking import BookingService, stripe_client
+
+
+def start_stub(*args: str) -> tuple[subprocess.Popen, str]:
+    stub = subprocess.Popen(
+        [sys.executable, str(HERE / "stripe_stub.py"), "--port", "0", *args],
+        stdout=subprocess.PIPE, text=True,
+    )
+    return stub, stub.stdout.readline().strip()
+
+
+def stub_stats(url: str) -> dict:
+    with urllib.request.urlopen(f"{url}/_stats") as response:
+        return json.load(response)
+
+
+def global_client(i: int, run: str) -> None:
+    customer = stripe.Customer.create(source="tok_visa")
+    stripe.Charge.create(amount=35000, currency="usd", description=f"Flight booking for {i}", customer=customer.id)
+
+
+def run_threads(book, bookings: int, concurrency: int) -> list[float]:
+    def timed(i: int) -> float:
+        start = time.perf_counter()
+        book(i)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(timed, range(bookings)))
+
+
+async def run_async(service: BookingService, run: str, bookings: int, concurrency: int) -> list[float]:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int) -> float:
+        async with gate:
+            start = time.perf_counter()
+            await service.book_async(str(i), 35000, f"{run}-{i}")
+            return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(timed(i) for i in range(bookings)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=400)
+    parser.add_argument("--concurrency", default="1,8,32,64")
+    args = parser.parse_args()
+
+    stub, url = start_stub()
+    try:
+        stripe.api_key, stripe.api_base = "sk_test_stub", url
+        print(f"{'client':>8} {'conc':>5} {'bookings/s':>10} {'p50 ms':>7} {'p99 ms':>7} {'requests':>8} {'conns':>6}")
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            for name in ("global", "pooled", "async"):
+                run = f"{name}-{concurrency}"
+                service = BookingService(stripe_client("sk_test_stub", url, pool_size=concurrency))
+                before = stub_stats(url)
+                start = time.perf_counter()
+                if name == "global":
+                    samples = run_threads(lambda i: global_client(i, run), args.bookings, concurrency)
+                elif name == "pooled":
+                    samples = run_threads(
+                        lambda i: service.book(str(i), 35000, f"{run}-{i}"), args.bookings, concurrency
+                    )
+                else:
+                    samples = asyncio.run(run_async(service, run, args.bookings, concurrency))
+                elapsed = time.perf_counter() - start
+                after = stub_stats(url)
+                samples.sort()
+                print(f"{name:>8} {concurrency:>5} {args.bookings / elapsed:>10.0f} "
+                      f"{statistics.median(samples):>7.2f} {samples[int(len(samples) * 0.99)]:>7.2f} "
+                      f"{after['requests'] - before['requests']:>8} {after['connections'] - before['connections']:>6}")
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
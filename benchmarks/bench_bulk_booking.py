@@ -0,0 +1,76 @@
+"""Group bookings against the local Stripe stub: one at a time versus bulk.
+
+Starts stripe_stub.py with --latency, --jitter and --error-rate and books
+groups of --items passengers three ways: a book() per passenger in turn
+(book_flight called once per seat, without the LLM turns in between),
+book_flights_bulk on its bounded thread pool, and book_flights_bulk_async
+on one event loop. "failed" counts items still failing after the SDK's
+retries, reported in the result while the rest of the group is booked;
+"injected" counts the stub errors behind them.
+
+    poetry run python benchmarks/bench_bulk_booking.py --items 10,100,1000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from bench_booking import start_stub, stub_stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.booking import BookingService, stripe_client
+from agent_tools.bulk_booking import book_flights_bulk, book_flights_bulk_async
+
+
+def group(size: int) -> list[dict]:
+    return [{"flight_id": "1", "price": "350.00", "passenger": f"Passenger {i}"} for i in range(size)]
+
+
+def one_at_a_time(service: BookingService, items: list[dict], run: str) -> int:
+    failed = 0
+    for item in items:
+        try:
+            service.book(item["flight_id"], 35000, session_id=run, passenger=item["passenger"])
+        except Exception:
+            failed += 1
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", default="10,100,1000")
+    parser.add_argument("--concurrency", type=int, default=8, help="bulk booking workers")
+    parser.add_argument("--latency", default="50", help="stub ms per request")
+    parser.add_argument("--jitter", default="25")
+    parser.add_argument("--error-rate", default="0.02")
+    args = parser.parse_args()
+
+    stub, url = start_stub("--latency", args.latency, "--jitter", args.jitter, "--error-rate", args.error_rate)
+    try:
+        print(f"{'items':>6} {'mode':>10} {'seconds':>8} {'items/s':>8} {'failed':>6} {'injected':>8}")
+        for size in (int(n) for n in args.items.split(",")):
+            items = group(size)
+            for mode in ("serial", "bulk", "bulk_async"):
+                run = f"{mode}-{size}"
+                service = BookingService(stripe_client("sk_test_stub", url))
+                before = stub_stats(url)
+                start = time.perf_counter()
+                if mode == "serial":
+                    failed = one_at_a_time(service, items, run)
+                elif mode == "bulk":
+                    failed = book_flights_bulk(items, run, concurrency=args.concurrency, service=service)["failed"]
+                else:
+                    failed = asyncio.run(
+                        book_flights_bulk_async(items, run, concurrency=args.concurrency, service=service)
+                    )["failed"]
+                elapsed = time.perf_counter() - start
+                injected = stub_stats(url)["errors"] - before["errors"]
+                print(f"{size:>6} {mode:>10} {elapsed:>8.2f} {size / elapsed:>8.0f} {failed:>6} {injected:>8}")
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
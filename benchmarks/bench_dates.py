@@ -0,0 +1,69 @@
+"""Compare agent_tools.dates.parse_date with the raw dateparser calls it replaced.
+
+Reports the cold first call (locale loading), then the per-call time of
+each approach over a mix of typical user inputs, with and without a warm
+cache.
+
+    poetry run python benchmarks/bench_dates.py
+"""
+import argparse
+import datetime
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+import dateparser
+
+from agent_tools import dates
+
+INPUTS = [
+    "2026-06-01", "06/08/2026", "June 5", "5 June", "July 4th", "Dec 24, 2026",
+    "tomorrow", "in 2 weeks", "next friday", "the 4th of July",
+]
+
+
+def raw_parse(date_str: str):
+    dt = dateparser.parse(
+        date_str,
+        settings={"PREFER_DATES_FROM": "future", "RELATIVE_BASE": datetime.datetime.now()},
+    )
+    return dt.strftime("%Y-%m-%d") if dt else None
+
+
+def per_call_us(fn, iterations: int, before=None) -> float:
+    total = 0.0
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        for text in INPUTS:
+            fn(text)
+        total += time.perf_counter() - start
+    return total / (iterations * len(INPUTS)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    # Cold start: the first call loads locale data
+    start = time.perf_counter()
+    dates.warm_up()
+    print(f"warm_up ({','.join(dates.LANGUAGES)})       {(time.perf_counter() - start) * 1000:10.1f} ms")
+    start = time.perf_counter()
+    raw_parse("June 5")
+    print(f"first raw dateparser call  {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    print(f"raw dateparser             {per_call_us(raw_parse, args.iterations):10.1f} us/call")
+    print(f"parse_date, cache cleared  "
+          f"{per_call_us(dates.parse_date, args.iterations, dates._parse_cached.cache_clear):10.1f} us/call")
+    print(f"parse_date, cached         {per_call_us(dates.parse_date, args.iterations):10.1f} us/call")
+    fast = sum(dates.fast_parse(t.lower(), datetime.date.today()) is not None for t in INPUTS)
+    print(f"fast path hits             {fast}/{len(INPUTS)} inputs")
+
+
+if __name__ == "__main__":
+    main()
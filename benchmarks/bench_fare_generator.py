@@ -0,0 +1,83 @@
+"""Mock fare generators: reproducibility and synthetic-workload throughput.
+
+Checks that the seeded generator gives the same prices for the same search
+in a fresh process, and how many of --searches random searches change
+price between two runs with each generator. Then times a synthetic search
+of increasing size end to end: generating the fares, ranking the
+SEARCH_MAX_RESULTS cheapest, and serializing one page for the prompt
+(agent_tools.records) and as JSON (UI and workflow history).
+
+    poetry run python benchmarks/bench_fare_generator.py --fares 1000,10000,100000
+"""
+import argparse
+import heapq
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASIC = Path(__file__).resolve().parent.parent / "basic"
+sys.path.insert(0, str(BASIC))
+
+from agent_tools.fare_generator import RandomFareGenerator, SeededFareGenerator, SyntheticFareGenerator
+from agent_tools.records import Flight, serialize_result
+from agent_tools.search import MAX_RESULTS
+
+SEARCH = ("LAX", "NYC", "2027-06-01", "2027-06-08")
+
+
+def prices(generator, searches: int) -> list[list[str]]:
+    return [
+        [f["price"] for f in generator.fares("LAX", "NYC", f"2027-06-{1 + i % 28:02d}", f"2027-07-{1 + i % 28:02d}")]
+        for i in range(searches)
+    ]
+
+
+def fresh_process_prices() -> list[str]:
+    code = (
+        "from agent_tools.fare_generator import SeededFareGenerator\n"
+        f"print(','.join(f['price'] for f in SeededFareGenerator().fares(*{SEARCH!r})))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASIC, capture_output=True, text=True, check=True)
+    return out.stdout.strip().split(",")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--searches", type=int, default=1000)
+    parser.add_argument("--fares", default="1000,10000,100000", help="synthetic fares per search")
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    same = fresh_process_prices() == [f["price"] for f in SeededFareGenerator().fares(*SEARCH)]
+    print(f"seeded prices identical in a fresh process: {same}")
+    for name, make in (("seeded", SeededFareGenerator), ("random", RandomFareGenerator)):
+        first, second = prices(make(), args.searches), prices(make(), args.searches)
+        changed = sum(a != b for a, b in zip(first, second))
+        print(f"{name:>7}: {changed} of {args.searches} searches changed price between runs")
+
+    print(f"{'fares':>8} {'generate+rank ms':>16} {'compact ms':>10} {'json ms':>8} {'compact B':>9} {'json B':>7}")
+    for count in (int(n) for n in args.fares.split(",")):
+        generator = SyntheticFareGenerator(count=count)
+        rank_ms, compact_ms, json_ms = [], [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ranked = heapq.nsmallest(MAX_RESULTS, generator.fares(*SEARCH), key=lambda f: float(f["price"]))
+            page = {"flights": [Flight.from_dict({**f, "id": str(i)}).to_dict()
+                                for i, f in enumerate(ranked[:args.page_size], start=1)]}
+            rank_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            compact = serialize_result(page)
+            compact_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            full = json.dumps(page)
+            json_ms.append((time.perf_counter() - start) * 1000)
+        print(f"{count:>8,} {statistics.median(rank_ms):>16.1f} {statistics.median(compact_ms):>10.2f} "
+              f"{statistics.median(json_ms):>8.2f} {len(compact):>9,} {len(full):>7,}")
+
+
+if __name__ == "__main__":
+    main()
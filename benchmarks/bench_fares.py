@@ -0,0 +1,92 @@
+"""Query latency and memory of the memory-mapped fare inventory.
+
+Generates a synthetic inventory (by default 1000 routes x 365 days x 5 trip
+lengths x 2 fares = 3.65M fares) in a temporary directory, opens it like
+find_flights does and runs random exact-date searches and 30-day range
+queries with a price filter. Memory is read from /proc (Linux).
+
+    poetry run python benchmarks/bench_fares.py --routes 1000
+"""
+import argparse
+import datetime
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.fares import FareInventory, generate_inventory
+from bench_routes import synthetic_routes
+
+
+START = datetime.date(2027, 1, 1)
+TRIP_LENGTHS = (3, 5, 7, 10, 14)
+
+
+def memory_mb() -> dict[str, float]:
+    """RSS split into anonymous memory and file-backed (memory-mapped) pages."""
+    usage = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                usage[key] = int(value.split()[0]) / 1024
+    return usage
+
+
+def latency(fn, queries) -> tuple[float, float]:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(*q)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--fares-per-trip", type=int, default=2)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    routes = [(r["origin"], r["destination"]) for r in synthetic_routes(args.routes)]
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        total = generate_inventory(directory, routes, START, days=args.days,
+                                   trip_lengths=TRIP_LENGTHS, fares_per_trip=args.fares_per_trip)
+        print(f"generated {total:,} fares in {time.perf_counter() - start:.1f}s")
+
+        before = memory_mb()
+        start = time.perf_counter()
+        inventory = FareInventory(directory)
+        print(f"opened in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        rng = random.Random(1)
+        exact, ranges = [], []
+        for _ in range(args.queries):
+            origin, destination = rng.choice(routes)
+            depart = START + datetime.timedelta(days=rng.randrange(args.days - 30))
+            ret = depart + datetime.timedelta(days=rng.choice(TRIP_LENGTHS))
+            exact.append((origin, destination, depart.isoformat(), ret.isoformat()))
+            first = (depart - datetime.date(1970, 1, 1)).days
+            ranges.append((origin, destination, first, first + 30))
+
+        p50, p99 = latency(inventory.search, exact)
+        print(f"exact date search   p50={p50:7.1f} us  p99={p99:7.1f} us")
+        p50, p99 = latency(
+            lambda o, d, lo, hi: inventory.query(o, d, lo, hi, max_price_cents=50000, limit=10), ranges)
+        print(f"30-day range query  p50={p50:7.1f} us  p99={p99:7.1f} us")
+        after = memory_mb()
+        print(f"{total * 18 / 1e6:.0f} MB of columns, after {2 * args.queries} queries: "
+              f"anonymous +{after['RssAnon'] - before['RssAnon']:.1f} MB, "
+              f"mapped file pages +{after['RssFile'] - before['RssFile']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
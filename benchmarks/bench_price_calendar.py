@@ -0,0 +1,81 @@
+"""One price_calendar call versus a find_flights-style search per date pair.
+
+Generates a synthetic inventory and answers "the cheapest week in a month"
+both ways: price_calendar's single vectorized pass, and one exact-date
+inventory search for every departure day x trip length (what the agent had
+to do with a tool call each before). Tool time only, the LLM round trips the
+loop would also cost are not included.
+
+    poetry run python benchmarks/bench_price_calendar.py --routes 1000
+"""
+import argparse
+import calendar
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools import fares, routes
+from agent_tools.fares import generate_inventory
+from agent_tools.price_calendar import FLEX_DAYS, price_calendar
+from bench_routes import synthetic_routes
+
+
+START = datetime.date(2027, 1, 1)
+TRIP_LENGTHS = tuple(range(3, 15))
+
+
+def per_date_searches(inventory, origin: str, destination: str, year: int, month: int, nights: int) -> list:
+    best = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        depart = datetime.date(year, month, day)
+        for n in range(nights - FLEX_DAYS, nights + FLEX_DAYS + 1):
+            ret = depart + datetime.timedelta(days=n)
+            best.extend(inventory.search(origin, destination, depart.isoformat(), ret.isoformat(), limit=1))
+    return sorted(best, key=lambda f: float(f["price"]))[:5]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    network = [(r["origin"], r["destination"]) for r in synthetic_routes(args.routes)]
+    with tempfile.TemporaryDirectory() as directory:
+        total = generate_inventory(directory, network, START, days=365, trip_lengths=TRIP_LENGTHS, fares_per_trip=2)
+        print(f"generated {total:,} fares")
+        os.environ["FARE_INVENTORY_DIR"] = directory
+        fares.get_fare_inventory.cache_clear()
+        inventory = fares.get_fare_inventory()
+        # price_calendar validates routes like find_flights, the inventory's
+        # routes.json is a valid ROUTES_FILE
+        os.environ["ROUTES_FILE"] = os.path.join(directory, "routes.json")
+        routes.get_route_index.cache_clear()
+
+        rng = random.Random(1)
+        queries = [(*rng.choice(network), rng.randrange(2, 11), 7) for _ in range(args.queries)]
+
+        loop, vectorized = [], []
+        for origin, destination, month, nights in queries:
+            start = time.perf_counter()
+            expected = per_date_searches(inventory, origin, destination, 2027, month, nights)
+            loop.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            result = price_calendar(origin, destination, f"2027-{month:02d}", nights)
+            vectorized.append((time.perf_counter() - start) * 1000)
+            assert [c["price"] for c in result["cheapest"]] == [f["price"] for f in expected]
+
+        searches = 31 * (2 * FLEX_DAYS + 1)
+        print(f"per-date searches (~{searches} per month)  p50={statistics.median(loop):7.2f} ms")
+        print(f"price_calendar                      p50={statistics.median(vectorized):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
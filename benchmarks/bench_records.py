@@ -0,0 +1,83 @@
+"""Prompt size and memory of flight results: JSON dicts versus compact records.
+
+Builds find_flights results of increasing page size, direct and connecting,
+and compares what goes into the prompt as JSON (as tool results were sent
+before) with the shared-header table of agent_tools.records, in bytes and
+tokens. Tokens are counted with tiktoken's cl100k_base encoding when it is
+available, otherwise estimated as bytes / 4. Memory is the tracemalloc
+size of a quote-cache entry of each size held as dicts and as Flight records.
+
+    poetry run python benchmarks/bench_records.py
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.records import Flight, serialize_result
+from agent_tools.route_graph import connecting_flights
+
+
+def token_counter():
+    """A token count function and its name."""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return (lambda text: len(encoding.encode(text))), "cl100k_base"
+    except Exception:
+        return (lambda text: len(text.encode("utf-8")) // 4), "bytes/4 estimate"
+
+
+def direct_flights(n: int) -> list[dict]:
+    return [
+        {"id": str(i), "origin": "LAX", "destination": "NYC", "departure_date": "2027-06-01",
+         "return_date": "2027-06-08", "price": f"{300 + i * 7.31:.2f}", "currency": "USD",
+         "seats": 9 - i % 9, "quote_id": f"Q{i * 7919:012X}"}
+        for i in range(1, n + 1)
+    ]
+
+
+def connecting(n: int) -> list[dict]:
+    flights = []
+    for i, flight in enumerate(connecting_flights("LAX", "VIE", "2027-06-01", "2027-06-08", 2, n), start=1):
+        flights.append({"id": str(i), **flight, "currency": "USD", "quote_id": f"Q{i * 7919:012X}"})
+    # The mock network has few 2-stop paths, repeat them to fill bigger pages
+    return [{**flights[i % len(flights)], "id": str(i + 1)} for i in range(n)]
+
+
+def allocated(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="3,10,30", help="flights per result")
+    args = parser.parse_args()
+
+    count, encoding = token_counter()
+    print(f"tokens: {encoding}")
+    print(f"{'kind':>10} {'flights':>7} {'json B':>7} {'compact B':>9} {'json tok':>8} {'compact tok':>11} "
+          f"{'saved':>6} {'dicts B':>8} {'Flight B':>8}")
+    for kind, build in (("direct", direct_flights), ("connecting", connecting)):
+        for n in (int(s) for s in args.sizes.split(",")):
+            flights = build(n)
+            result = {"flights": flights, "next_cursor": "WyJMQVgiLCJOWUMiLCIyMDI3LTA2LTAxIiwiMjAyNy0wNi0wOCIsMCwzXQ"}
+            old, new = json.dumps(result), serialize_result(result)
+            old_tokens, new_tokens = count(old), count(new)
+            dict_bytes = allocated(lambda: [json.loads(json.dumps(f)) for f in flights])
+            record_bytes = allocated(lambda: [Flight.from_dict(json.loads(json.dumps(f))) for f in flights])
+            print(f"{kind:>10} {n:>7} {len(old):>7,} {len(new):>9,} {old_tokens:>8,} {new_tokens:>11,} "
+                  f"{1 - new_tokens / old_tokens:>6.0%} {dict_bytes:>8,} {record_bytes:>8,}")
+
+
+if __name__ == "__main__":
+    main()
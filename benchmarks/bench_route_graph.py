@@ -0,0 +1,104 @@
+"""Connecting-itinerary search latency on large route networks.
+
+Builds RouteGraph over two synthetic networks and times the k cheapest 1-
+and 2-stop itineraries between random airports: the pruned search
+find_flights uses versus enumerating every path. Both must agree on the
+fares. "random" has ~3,600 airports with 100k uniformly random routes;
+"hubs" has 5,000 airports, each served by a few of 150 densely connected
+hubs, which is closer to a real network and has far more 2-stop paths.
+
+    poetry run python benchmarks/bench_route_graph.py
+"""
+import argparse
+import heapq
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.route_graph import RouteGraph, schedule
+from agent_tools.routes import RouteIndex
+from bench_routes import synthetic_routes
+
+
+def hub_routes(airports: int = 5000, hubs: int = 150, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    codes = [f"{chr(65 + i // 676)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}" for i in range(airports)]
+    hub_codes, spokes = codes[:hubs], codes[hubs:]
+    routes = set()
+    for hub in hub_codes:
+        for other in rng.sample(hub_codes, 60):
+            if other != hub:
+                routes.update({(hub, other), (other, hub)})
+    for spoke in spokes:
+        for hub in rng.sample(hub_codes, rng.randint(2, 6)):
+            routes.update({(spoke, hub), (hub, spoke)})
+    return [{"origin": o, "destination": d} for o, d in sorted(routes)]
+
+
+def exhaustive(graph: RouteGraph, origin: str, destination: str, max_stops: int, k: int) -> list[int]:
+    """Fares of the k cheapest valid itineraries, checking every path."""
+    fares = []
+    out = graph._outgoing
+    for first in out.get(origin, ()):
+        hub = first.destination
+        if hub == destination:
+            continue
+        last = graph.leg(hub, destination)
+        if last and schedule([first, last]):
+            fares.append(first.fare_cents + last.fare_cents)
+        if max_stops < 2:
+            continue
+        for second in out.get(hub, ()):
+            hub2 = second.destination
+            if hub2 in (origin, destination):
+                continue
+            last = graph.leg(hub2, destination)
+            if last and schedule([first, second, last]):
+                fares.append(first.fare_cents + second.fare_cents + last.fare_cents)
+    return heapq.nsmallest(k, fares)
+
+
+def timed_ms(fn, queries) -> tuple[float, float, list]:
+    samples, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(*q))
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)], results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'network':>8} {'routes':>8} {'airports':>8} {'build ms':>9} {'stops':>5} {'pruned p50':>11} "
+          f"{'p99':>7} {'all paths p50':>14} {'p99':>8}")
+    for name, routes in (("random", synthetic_routes(100_000)), ("hubs", hub_routes())):
+        size = len(routes)
+        index = RouteIndex.from_dicts(routes)
+        start = time.perf_counter()
+        graph = RouteGraph.from_index(index)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(size)
+        airports = sorted(index.origins())
+        queries = [tuple(rng.sample(airports, 2)) for _ in range(args.queries)]
+        for stops in (1, 2):
+            pruned = lambda o, d: [f for f, _, _ in graph.itineraries(o, d, stops, args.k, include_direct=False)]
+            p50, p99, fast = timed_ms(pruned, queries)
+            full = lambda o, d: exhaustive(graph, o, d, stops, args.k)
+            all_p50, all_p99, expected = timed_ms(full, queries)
+            assert fast == expected
+            print(f"{name:>8} {size:>8,} {len(graph):>8,} {build_ms:>9.0f} {stops:>5} {p50:>8.2f} ms {p99:>7.2f} "
+                  f"{all_p50:>11.2f} ms {all_p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Route validation and "supported destinations" with a list scan versus RouteIndex.
+
+Builds synthetic networks of 10k and 100k routes, writes each to a CSV file
+and loads it through RouteIndex.from_file like ROUTES_FILE does.
+
+    poetry run python benchmarks/bench_routes.py
+"""
+import argparse
+import csv
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.routes import RouteIndex
+
+
+def synthetic_routes(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    airports = sorted({"".join(rng.choices(string.ascii_uppercase, k=3)) for _ in range(4000)})
+    routes = set()
+    while len(routes) < count:
+        origin, destination = rng.sample(airports, 2)
+        routes.add((origin, destination))
+    return [{"origin": o, "destination": d} for o, d in sorted(routes)]
+
+
+def timed_us(fn, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(*q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'routes':>8} {'load ms':>8} {'scan valid us':>14} {'index valid us':>15} "
+          f"{'scan dests us':>14} {'index dests us':>15}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        routes = synthetic_routes(size)
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as f:
+            writer = csv.DictWriter(f, fieldnames=["origin", "destination"])
+            writer.writeheader()
+            writer.writerows(routes)
+        start = time.perf_counter()
+        index = RouteIndex.from_file(f.name)
+        load_ms = (time.perf_counter() - start) * 1000
+        Path(f.name).unlink()
+
+        rng = random.Random(size)
+        queries = [(r["origin"], r["destination"]) for r in rng.sample(routes, args.queries)]
+        origins = [(q[0],) for q in queries]
+
+        scan_valid = timed_us(lambda o, d: any(
+            r["origin"] == o and r["destination"] == d for r in routes), queries)
+        index_valid = timed_us(index.is_valid, queries)
+        scan_dests = timed_us(lambda o: [r["destination"] for r in routes if r["origin"] == o], origins)
+        index_dests = timed_us(index.destinations_from, origins)
+        print(f"{size:>8} {load_ms:>8.0f} {scan_valid:>14.1f} {index_valid:>15.2f} "
+              f"{scan_dests:>14.1f} {index_dests:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Latency and result size of a full flight list versus the first ranked page.
+
+Builds inventories where a single (route, departure, return) search matches
+more and more fares, then compares returning every match (query, records,
+JSON) with the streaming top-k search find_flights uses, which keeps the
+SEARCH_MAX_RESULTS cheapest in a bounded heap and returns one page. The
+"more" column is a follow-up page served from the quote cache.
+
+    poetry run python benchmarks/bench_search.py --matches 100,1000,10000,100000
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools import fares, quotes
+from agent_tools.fares import generate_inventory, to_day
+from agent_tools.search import page_from_cursor, search_page
+
+
+START = datetime.date(2027, 1, 1)
+ROUTES = [("LAX", "NYC"), ("LAX", "MUC"), ("LAX", "SFO"), ("LAX", "CDG"), ("LAX", "ORD")]
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", default="100,1000,10000,100000", help="fares per search")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    depart, ret = START.isoformat(), (START + datetime.timedelta(days=7)).isoformat()
+    key = ("LAX", "NYC", depart, ret, 0)
+    print(f"{'matches':>8} {'full us':>10} {'full bytes':>11} {'page us':>9} {'more us':>8} {'page bytes':>11}")
+    for matches in (int(n) for n in args.matches.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            generate_inventory(directory, ROUTES, START, days=2, trip_lengths=(7,), fares_per_trip=matches)
+            os.environ["FARE_INVENTORY_DIR"] = directory
+            fares.get_fare_inventory.cache_clear()
+            inventory = fares.get_fare_inventory()
+
+            def full():
+                rows = inventory.query("LAX", "NYC", to_day(depart), return_from=to_day(ret))
+                return json.dumps(inventory.records(rows))
+
+            def first_page():
+                # A fresh cache every time, so each call runs the search
+                quotes.get_quote_cache.cache_clear()
+                return json.dumps(search_page(key))
+
+            full_us, full_json = timed(full, args.repeat)
+            page_us, page_json = timed(first_page, args.repeat)
+            cursor = json.loads(page_json).get("next_cursor", "")
+            more_us, _ = timed(lambda: page_from_cursor(cursor), args.repeat)
+            print(f"{matches:>8,} {full_us:>10.0f} {len(full_json):>11,} "
+                  f"{page_us:>9.0f} {more_us:>8.1f} {len(page_json):>11,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Seat holds under contention: one lock versus lock striping.
+
+--sessions threads each take --ops holds on flights picked at random out of
+--flights (each with --capacity seats), then confirm 70% of them, release
+20% and abandon the rest for the reaper (a --ttl second hold, swept every
+--ttl / 2). Run with every flight behind one lock and with
+SEAT_LOCK_STRIPES stripes. "p99 us" is the slowest 1% of hold() calls,
+lock wait included; "conflicts" is the share of holds refused because the
+flight was full; "sold" never exceeds the seats on sale.
+
+    poetry run python benchmarks/bench_seats.py --flights 1,100,10000 --sessions 32
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "basic"))
+
+from agent_tools.seats import STRIPES, SeatInventory
+
+
+def session(inventory: SeatInventory, number: int, flights: int, capacity: int, ops: int, waits: list) -> None:
+    rng = random.Random(number)
+    for i in range(ops):
+        flight = f"Q{rng.randrange(flights)}"
+        start = time.perf_counter()
+        held = inventory.hold(flight, f"s{number}-{i}", capacity)
+        waits.append(time.perf_counter() - start)
+        if held is None:
+            continue
+        roll = rng.random()
+        if roll < 0.7:
+            inventory.confirm(held.hold_id, capacity)
+        elif roll < 0.9:
+            inventory.release(held.hold_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", default="1,100,10000")
+    parser.add_argument("--capacity", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=2000, help="holds per session")
+    parser.add_argument("--ttl", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'flights':>7} {'stripes':>7} {'holds/s':>9} {'p99 us':>7} {'conflicts':>9} "
+          f"{'sold':>7} {'on sale':>7} {'expired':>7}")
+    for flights in (int(n) for n in args.flights.split(",")):
+        for stripes in (1, STRIPES):
+            inventory = SeatInventory(stripes=stripes, ttl=args.ttl)
+            inventory.start_reaper(args.ttl / 2)
+            waits: list[float] = []
+            threads = [
+                threading.Thread(target=session, args=(inventory, n, flights, args.capacity, args.ops, waits))
+                for n in range(args.sessions)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            inventory.stop()
+            stats = inventory.stats()
+            attempts = args.sessions * args.ops
+            waits.sort()
+            print(f"{flights:>7} {stripes:>7} {attempts / elapsed:>9.0f} {waits[int(len(waits) * 0.99)] * 1e6:>7.0f} "
+                  f"{stats['conflicts'] / attempts:>9.1%} "
+                  f"{stats['sold']:>7} {flights * args.capacity:>7} {stats['expired']:>7}")
+
+
+if __name__ == "__main__":
+    main()
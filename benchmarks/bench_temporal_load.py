@@ -0,0 +1,147 @@
+"""Load test AgentWorkflow with N concurrent scripted sessions.
+
+Each session starts an AgentWorkflow and sends the search -> book script from
+``temporal_stubs`` through the ``submit_turn`` update. Activities are the
+offline stubs, so no OpenAI or Stripe access is needed. For every level of
+concurrency the harness reports turn latency percentiles, workflow tasks per
+second (counted from the workflow histories) and the RSS of this process,
+which hosts the worker.
+
+By default it runs on a local Temporal dev server, which supports updates
+(the time-skipping test server does not). For CI without network access
+point ``--dev-server-path`` at a pre-downloaded ``temporal`` CLI, or use
+``--target`` to run against an existing server.
+
+    poetry run python benchmarks/bench_temporal_load.py --sessions 1,10,50,100
+"""
+import argparse
+import asyncio
+import dataclasses
+import resource
+import sys
+import time
+import uuid
+
+from temporalio.api.enums.v1 import EventType
+from temporalio.client import Client
+from temporalio.converter import DataConverter
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from temporal_stubs import SCRIPT, STUB_ACTIVITIES
+from codec import CompressionCodec
+from history import SessionState
+from workflows import AgentWorkflow
+
+TASK_QUEUE = "bench-temporal-load"
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak RSS where /proc is not available (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_session(client: Client, prefix: str) -> tuple[str, list[float]]:
+    workflow_id = f"{prefix}-{uuid.uuid4()}"
+    handle = await client.start_workflow(
+        AgentWorkflow.run,
+        SessionState(),
+        id=workflow_id,
+        task_queue=TASK_QUEUE,
+    )
+    latencies = []
+    for msg in SCRIPT:
+        start = time.perf_counter()
+        await handle.execute_update(AgentWorkflow.submit_turn, msg)
+        latencies.append(time.perf_counter() - start)
+    await handle.result()
+    return workflow_id, latencies
+
+
+async def count_workflow_tasks(client: Client, workflow_ids: list[str]) -> int:
+    total = 0
+    for workflow_id in workflow_ids:
+        history = await client.get_workflow_handle(workflow_id).fetch_history()
+        total += sum(
+            1 for e in history.events
+            if e.event_type == EventType.EVENT_TYPE_WORKFLOW_TASK_COMPLETED
+        )
+    return total
+
+
+async def run_level(client: Client, sessions: int) -> None:
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_session(client, f"bench-load-{sessions}") for _ in range(sessions))
+    )
+    elapsed = time.perf_counter() - start
+    latencies = [l * 1000 for _, session in results for l in session]
+    tasks = await count_workflow_tasks(client, [workflow_id for workflow_id, _ in results])
+    print(
+        f"{sessions:>8} {len(latencies):>6} {percentile(latencies, 50):>8.1f} "
+        f"{percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} "
+        f"{tasks / elapsed:>10.1f} {rss_mb():>8.1f}"
+    )
+
+
+async def start_environment(args, data_converter: DataConverter) -> WorkflowEnvironment:
+    if args.target:
+        return WorkflowEnvironment.from_client(
+            await Client.connect(args.target, data_converter=data_converter)
+        )
+    return await WorkflowEnvironment.start_local(
+        data_converter=data_converter,
+        dev_server_existing_path=args.dev_server_path,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", default="1,10,50,100",
+                        help="comma-separated numbers of concurrent sessions")
+    parser.add_argument("--max-concurrent-activities", type=int, default=100)
+    parser.add_argument("--max-concurrent-workflow-tasks", type=int, default=100)
+    parser.add_argument("--dev-server-path", help="pre-downloaded temporal CLI to run the dev server")
+    parser.add_argument("--target", help="use an existing server, e.g. localhost:7233")
+    parser.add_argument("--codec", choices=["zlib", "zstd"], help="compress payloads")
+    args = parser.parse_args()
+
+    codec = CompressionCodec(args.codec) if args.codec else None
+    data_converter = dataclasses.replace(DataConverter.default, payload_codec=codec)
+
+    async with await start_environment(args, data_converter) as env:
+        async with Worker(
+            env.client,
+            task_queue=TASK_QUEUE,
+            workflows=[AgentWorkflow],
+            activities=STUB_ACTIVITIES,
+            max_concurrent_activities=args.max_concurrent_activities,
+            max_concurrent_workflow_tasks=args.max_concurrent_workflow_tasks,
+        ):
+            print(f"{'sessions':>8} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} "
+                  f"{'p99 ms':>8} {'wf tasks/s':>10} {'rss MB':>8}")
+            for sessions in (int(n) for n in args.sessions.split(",")):
+                await run_level(env.client, sessions)
+
+    if codec is not None:
+        stats = codec.stats()
+        print(f"payloads raw={stats['raw_bytes']} encoded={stats['encoded_bytes']} "
+              f"ratio={stats['ratio']:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""Compare per-turn latency of the signal + is_ready polling path with the
+``submit_turn`` workflow update.
+
+Runs against a local Temporal dev server started by the SDK (downloaded on
+first use) with the stub activities from ``temporal_stubs``:
+
+    poetry run python benchmarks/bench_turn_latency.py --sessions 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from temporal_stubs import SCRIPT, STUB_ACTIVITIES
+from workflows import AgentWorkflow
+
+TASK_QUEUE = "bench-turn-latency"
+
+
+async def signal_poll_session(client, poll_interval: float) -> list[float]:
+    """The pre-update UI flow: signal, poll is_ready, then fetch the history."""
+    handle = None
+    seen = 0
+    latencies = []
+    for msg in SCRIPT:
+        start = time.perf_counter()
+        if handle is None:
+            handle = await client.start_workflow(
+                AgentWorkflow.run,
+                id=f"bench-signal-{uuid.uuid4()}",
+                task_queue=TASK_QUEUE,
+                start_signal="user_message",
+                start_signal_args=[msg],
+            )
+        else:
+            await handle.signal(AgentWorkflow.user_message, msg)
+        # is_ready alone can be read before the signal is processed, so also
+        # wait for the history to grow past what the previous turn returned
+        while True:
+            if await handle.query(AgentWorkflow.is_ready):
+                conv = await handle.query(AgentWorkflow.get_history)
+                if len(conv) > seen + 1:
+                    break
+            await asyncio.sleep(poll_interval)
+        seen = len(conv)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def update_session(client) -> list[float]:
+    """The current UI flow: one submit_turn update per message."""
+    handle = None
+    latencies = []
+    for msg in SCRIPT:
+        start = time.perf_counter()
+        if handle is None:
+            handle = await client.start_workflow(
+                AgentWorkflow.run,
+                id=f"bench-update-{uuid.uuid4()}",
+                task_queue=TASK_QUEUE,
+            )
+        await handle.execute_update(AgentWorkflow.submit_turn, msg)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    ms = sorted(l * 1000 for l in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{name:<14} turns={len(ms):<5} mean={statistics.mean(ms):8.1f}ms "
+          f"p50={statistics.median(ms):8.1f}ms p95={p95:8.1f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    async with await WorkflowEnvironment.start_local() as env:
+        async with Worker(
+            env.client,
+            task_queue=TASK_QUEUE,
+            workflows=[AgentWorkflow],
+            activities=STUB_ACTIVITIES,
+        ):
+            for name, run in (
+                ("signal+poll", lambda: signal_poll_session(env.client, args.poll_interval)),
+                ("update", lambda: update_session(env.client)),
+            ):
+                results = await asyncio.gather(*(run() for _ in range(args.sessions)))
+                report(name, [l for session in results for l in session])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
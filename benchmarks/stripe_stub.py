@@ -0,0 +1,162 @@
+"""A local stand-in for the Stripe API endpoints book_flight uses.
+
+Answers POST /v1/customers and /v1/charges with minimal Stripe-shaped JSON
+over HTTP/1.1 keep-alive, honors Idempotency-Key (a repeated key replays
+the first response), and counts the TCP connections and requests it served,
+readable at GET /_stats. Each request takes --latency ms, give or take up to
+--jitter ms, and --error-rate of them fail with --error-status (a Stripe
+api_error the SDK retries) before anything is created, so a retry with the
+same key succeeds. Point the booking tools at it with
+STRIPE_API_BASE=http://127.0.0.1:PORT, or a client with
+stripe_client(api_base="http://127.0.0.1:PORT").
+
+    poetry run python benchmarks/stripe_stub.py --port 12111 --latency 150 --jitter 100 --error-rate 0.02
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qs
+
+
+class StripeStub(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.replies: Dict[str, bytes] = {}
+        self.counts = {"connections": 0, "requests": 0, "customers": 0, "charges": 0, "replayed": 0, "errors": 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+    def delay(self) -> Tuple[float, bool]:
+        """Seconds to wait before answering, and whether the request fails."""
+        with self.lock:
+            seconds = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)) / 1000
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.counts["errors"] += 1
+            return seconds, failed
+
+    def create(self, path: str, form: Dict[str, Any]) -> Dict[str, Any]:
+        n = next(self.ids)
+        if path == "/v1/customers":
+            return {"id": f"cus_stub{n}", "object": "customer"}
+        return {
+            "id": f"ch_stub{n}",
+            "object": "charge",
+            "amount": int(form.get("amount", 0)),
+            "currency": form.get("currency", "usd"),
+            "customer": form.get("customer"),
+            "paid": True,
+            "status": "succeeded",
+            "receipt_url": f"https://pay.stripe.com/receipts/stub/ch_stub{n}",
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes
+    disable_nagle_algorithm = True
+    server: StripeStub
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.counts["connections"] += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == "/_stats":
+            self._reply(200, json.dumps(self.server.stats()).encode("utf-8"))
+        else:
+            self._reply(404, b'{"error": {"message": "Unknown path"}}')
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+        if self.path not in ("/v1/customers", "/v1/charges"):
+            self._reply(404, b'{"error": {"message": "Unknown path"}}')
+            return
+        stub = self.server
+        seconds, failed = stub.delay()
+        if seconds:
+            time.sleep(seconds)
+        if failed:
+            # Like Stripe, a failure before the request ran is not saved
+            # under its idempotency key and tells the client to retry
+            self._reply(
+                stub.error_status,
+                b'{"error": {"type": "api_error", "message": "Injected stub error"}}',
+                {"Stripe-Should-Retry": "true"},
+            )
+            return
+        form = {k: v[0] for k, v in parse_qs(body).items()}
+        key = self.headers.get("Idempotency-Key")
+        with stub.lock:
+            stub.counts["requests"] += 1
+            payload = stub.replies.get(key) if key else None
+            replayed = payload is not None
+            if replayed:
+                stub.counts["replayed"] += 1
+            else:
+                stub.counts["customers" if self.path == "/v1/customers" else "charges"] += 1
+                payload = json.dumps(stub.create(self.path, form)).encode("utf-8")
+                if key:
+                    stub.replies[key] = payload
+        self._reply(200, payload, {"Idempotent-Replayed": "true"} if replayed else {})
+
+    def _reply(self, status: int, payload: bytes, headers: Dict[str, str] = {}) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Request-Id", f"req_stub{next(self.server.ids)}")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many ms more or less")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = StripeStub(args.port, args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    print(server.url, flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
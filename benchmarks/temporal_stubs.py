@@ -0,0 +1,88 @@
+"""Offline stand-ins for the Temporal agent activities.
+
+The stubs are registered under the same activity names as the real ones in
+``temporal/activities.py`` so ``AgentWorkflow`` runs unchanged, but no OpenAI or
+Stripe call is made. The planner is scripted: a user message containing "book"
+plans ``book_flight_tool``, one mentioning flights plans ``find_flights_tool``,
+a tool result gets an LLM follow-up and anything else gets a plain reply.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from temporalio import activity
+
+TEMPORAL_DIR = Path(__file__).resolve().parent.parent / "temporal"
+sys.path.insert(0, str(TEMPORAL_DIR))
+
+# activities.py builds an OpenAI client at import time, it is never called here
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-stub")
+
+# Simulated service latencies in seconds
+LLM_DELAY = float(os.getenv("STUB_LLM_DELAY", "0.05"))
+TOOL_DELAY = float(os.getenv("STUB_TOOL_DELAY", "0.01"))
+
+
+@activity.defn(name="run_agent")
+async def stub_run_agent(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    await asyncio.sleep(LLM_DELAY)
+    last = history[-1]
+    if last.get("actor") == "tool":
+        return [{"actor": "llm", "message": "Here are your options, which flight would you like?"}]
+    text = str(last.get("message", "")).lower()
+    if "book" in text:
+        return [{"actor": "tool", "tool": "book_flight_tool",
+                 "tool_input": {"flight_id": "1", "price": "350.00"}}]
+    if "flight" in text:
+        return [{"actor": "tool", "tool": "find_flights_tool",
+                 "tool_input": {"origin": "LAX", "destination": "NYC",
+                                "departure_date": "2026-06-01", "return_date": "2026-06-08"}}]
+    return [{"actor": "llm", "message": "Where would you like to fly?"}]
+
+
+@activity.defn(name="find_flights")
+async def stub_find_flights(origin: str, destination: str, departure_date: str, return_date: str,
+                            cursor: str = "", max_stops: int = 0) -> Any:
+    await asyncio.sleep(TOOL_DELAY)
+    return {"flights": [
+        {"id": str(i), "origin": origin, "destination": destination,
+         "departure_date": departure_date, "return_date": return_date,
+         "price": f"{300 + 25 * i:.2f}", "currency": "USD"}
+        for i in range(1, 4)
+    ]}
+
+
+@activity.defn(name="book_flight")
+async def stub_book_flight(flight_id: str, price: str, quote_id: str = "") -> Any:
+    await asyncio.sleep(TOOL_DELAY)
+    return {"receipt_url": f"https://pay.example.test/receipts/{flight_id}"}
+
+
+@activity.defn(name="hold_seats")
+async def stub_hold_seats(quote_id: str, count: int = 1) -> Any:
+    return {"hold_id": f"{quote_id}:stub"}
+
+
+@activity.defn(name="confirm_seats")
+async def stub_confirm_seats(hold_id: str) -> bool:
+    return True
+
+
+@activity.defn(name="release_seats")
+async def stub_release_seats(hold_id: str) -> bool:
+    return True
+
+
+STUB_ACTIVITIES = [
+    stub_run_agent, stub_find_flights, stub_book_flight, stub_hold_seats, stub_confirm_seats, stub_release_seats,
+]
+
+# A scripted search -> book conversation
+SCRIPT = [
+    "Hi there",
+    "Find me flights to New York from June 1 to June 8",
+    "What about the cheapest one?",
+    "Book flight 1",
+]
@@ -1,32 +1,66 @@
 import os
+from typing import Dict, List
 from dotenv import load_dotenv
 
 from crewai import Agent, LLM
 from crewai.tools import tool
 
 from agent_tools.find_flights import find_flights
-from agent_tools.book_flight  import book_flight
+from agent_tools.book_flight  import book_flight, book_flights_bulk
+from agent_tools.price_calendar import price_calendar
+from agent_tools.dates import warm_up
+from agent_tools.records import serialize_result
 
 load_dotenv(override=True)
 
+# Load the date parser's locale data before the first search
+warm_up()
+
 @tool("find_flights")
-def find_flights_tool(origin: str, destination: str, departure_date: str, return_date: str):
+def find_flights_tool(origin: str, destination: str, departure_date: str, return_date: str, cursor: str = "", max_stops: int = 0):
     """
-    Find flights from origin to destination.
+    Find flights from origin to destination, cheapest first, one page at a time.
     Args:
       origin: airport code (e.g. LAX)
-      destination: airport code (e.g. NYC)
+      destination: airport code or city name (e.g. NYC or New York)
       departure_date: YYYY-MM-DD or natural language date
       return_date: YYYY-MM-DD or natural language date
+      cursor: next_cursor of a previous result, to show more flights
+      max_stops: 0 for direct flights only, 1 or 2 to include connections
     """
-    return find_flights(origin, destination, departure_date, return_date)
+    return serialize_result(find_flights(origin, destination, departure_date, return_date, cursor, max_stops))
 
 @tool("book_flight")
-def book_flight_tool(flight_id: str, price: str):
+def book_flight_tool(flight_id: str, price: str, quote_id: str = ""):
+    """
+    Book a flight given flight_id, price and the quote_id from find_flights;
+    returns invoice_url or error.
+    """
+    return book_flight(flight_id, price, quote_id)
+
+@tool("book_flights_bulk")
+def book_flights_bulk_tool(items: List[Dict[str, str]]):
+    """
+    Book seats for a group in one call instead of one book_flight per seat.
+    Args:
+      items: one per passenger, each with passenger and the quote_id from
+        find_flights (or flight_id and price)
+    Returns every booking and every failed item.
+    """
+    return serialize_result(book_flights_bulk(items))
+
+@tool("price_calendar")
+def price_calendar_tool(origin: str, destination: str, month: str, trip_length: int):
     """
-    Book a flight given flight_id and price; returns invoice_url or error.
+    Find the cheapest departure and return dates in a month, e.g. the cheapest week in June.
+    Args:
+      origin: airport code (e.g. LAX)
+      destination: airport code or city name (e.g. NYC or New York)
+      month: month name or YYYY-MM
+      trip_length: nights at the destination
+    Use find_flights on the chosen dates to get bookable flights.
     """
-    return book_flight(flight_id, price)
+    return serialize_result(price_calendar(origin, destination, month, trip_length))
 
 # configure your LLM
 llm = LLM(
@@ -45,9 +79,10 @@ agent = Agent(
         "you must call the `find_flights` tool.  After it returns options, list each flight "
         "with its ID, price, departure and return dates, and then ask “Which flight ID would you like to book?”  "
         "Only once the user responds with something like “Book flight 2 at 350.00” should you call the `book_flight` tool.  "
-        "Do not ever initiate a booking before the user explicitly selects an ID."
+        "Do not ever initiate a booking before the user explicitly selects an ID.  "
+        "For several passengers, call `book_flights_bulk` once with an item per passenger."
     ),
     llm=llm,
-    tools=[find_flights_tool, book_flight_tool],
+    tools=[find_flights_tool, book_flight_tool, book_flights_bulk_tool, price_calendar_tool],
     verbose=True,
 )
\ No newline at end of file
@@ -0,0 +1,208 @@
+import csv
+import itertools
+import os
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from agent_tools.routes import get_route_index
+
+# Local city and airport name resolution for the tools.
+#
+# City names, airport names, aliases and codes from a bundled airport list
+# (AIRPORTS_FILE may point at another CSV with the same columns) go into a
+# prefix trie for exact and unambiguous prefix matches ("san fran"), and an
+# n-gram index for typos ("New Yrok"): names sharing bigrams or trigrams
+# with the input are ranked by Dice similarity, the best few by edit
+# distance. A typo match must be within an edit (two from 10 characters)
+# and a prefix must cover AIRPORT_MIN_PREFIX_SHARE of the names it
+# completes, so words that merely look like a city ("Atlantis", "Mars")
+# resolve to nothing.
+# Accents are folded, so "München" and "Munchen" match "Muenchen" too.
+# Where a city has several airports, the one in the route network wins.
+
+AIRPORTS_FILE = os.getenv("AIRPORTS_FILE") or str(Path(__file__).with_name("airports.csv"))
+MIN_SIMILARITY = float(os.getenv("AIRPORT_MIN_SIMILARITY", "0.4"))
+CACHE_SIZE = int(os.getenv("AIRPORT_CACHE_SIZE", "4096"))
+# Share of the shortest name a prefix must cover ("san fran", not "mars")
+MIN_PREFIX_SHARE = float(os.getenv("AIRPORT_MIN_PREFIX_SHARE", "0.6"))
+# Every this many characters of input allow one more edit in a typo match,
+# below MIN_TYPO_LENGTH (codes, "LA") an edit makes another place
+TYPO_EVERY = 10
+MIN_TYPO_LENGTH = 4
+# Names up to this long are matched on bigrams, where a typo leaves too
+# few trigrams intact ("mimai"), longer ones on trigrams
+SHORT_NAME = 6
+# Fuzzy candidates re-ranked by edit distance
+RERANK = 5
+
+def normalize(text: str) -> str:
+    """Lowercase words without accents or punctuation."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c if c.isalnum() else " " for c in text if not unicodedata.combining(c))
+    return " ".join(text.split())
+
+def ngrams(key: str, n: int) -> Set[str]:
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance counting a swap of adjacent characters as one edit."""
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        row = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        prev2, prev = prev, row
+    return prev[-1]
+
+class _Node:
+    __slots__ = ("children", "codes", "city", "below", "shortest")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Codes of the name ending here
+        self.codes: List[str] = []
+        # The city of every name below this node, "" once there are several,
+        # and their codes while there is only one
+        self.city: Optional[str] = None
+        self.below: List[str] = []
+        # Length of the shortest name below this node
+        self.shortest = 0
+
+class AirportResolver:
+    """City and airport names to IATA codes: exact, prefix and typo-tolerant lookups."""
+
+    def __init__(self, airports: Iterable[Tuple[str, str, Iterable[str]]], preferred: Iterable[str] = ()):
+        self._preferred = frozenset(preferred)
+        self._city: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+        self._root = _Node()
+        self._keys: List[str] = []
+        self._key_codes: List[List[str]] = []
+        # Bigrams and trigrams of every name, to key ids
+        self._grams: Dict[str, List[int]] = {}
+        key_ids: Dict[str, int] = {}
+        for code, city, names in airports:
+            code = code.strip().upper()
+            self._city.setdefault(code, normalize(city))
+            self._order.setdefault(code, len(self._order))
+            for name in (code, city, *names):
+                key = normalize(name)
+                if not key:
+                    continue
+                self._insert(key, code)
+                # Codes only match exactly, a typo in a code is another airport
+                if name == code:
+                    continue
+                if key not in key_ids:
+                    key_ids[key] = len(self._keys)
+                    self._keys.append(key)
+                    self._key_codes.append([])
+                    for gram in ngrams(key, 2) | ngrams(key, 3):
+                        self._grams.setdefault(gram, []).append(key_ids[key])
+                if code not in self._key_codes[key_ids[key]]:
+                    self._key_codes[key_ids[key]].append(code)
+        self._gram_counts = {n: [len(ngrams(key, n)) for key in self._keys] for n in (2, 3)}
+
+    @classmethod
+    def from_file(cls, path: str, preferred: Iterable[str] = ()) -> "AirportResolver":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return cls(
+            ((row["iata"], row["city"], [row.get("name") or "", *(row.get("aliases") or "").split("|")]) for row in rows),
+            preferred,
+        )
+
+    def _insert(self, key: str, code: str) -> None:
+        city = self._city[code]
+        node = self._root
+        for char in itertools.chain(key, [None]):
+            if node.city is None:
+                node.city = city
+            elif node.city != city:
+                node.city = ""
+                node.below = []
+            if node.city and code not in node.below:
+                node.below.append(code)
+            node.shortest = min(node.shortest or len(key), len(key))
+            if char is None:
+                break
+            node = node.children.setdefault(char, _Node())
+        if code not in node.codes:
+            node.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self._city)
+
+    def lookup(self, text: str) -> Optional[str]:
+        """The IATA code for a code, city or airport name, or None if nothing is close."""
+        key = normalize(text)
+        if not key:
+            return None
+        code = key.upper()
+        if len(code) == 3 and (code in self._city or code in self._preferred):
+            return code
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return self._fuzzy(key)
+        if node.codes:
+            return self._best(node.codes)
+        # A prefix of names that all belong to one city
+        if node.city and len(key) >= MIN_PREFIX_SHARE * node.shortest:
+            return self._best(node.below)
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        if len(key) < MIN_TYPO_LENGTH:
+            return None
+        n = 2 if len(key) <= SHORT_NAME else 3
+        grams = ngrams(key, n)
+        gram_counts = self._gram_counts[n]
+        shared = Counter(itertools.chain.from_iterable(self._grams.get(gram, ()) for gram in grams))
+        scored = []
+        for key_id, count in shared.most_common():
+            # The best any name sharing this few n-grams can score
+            if 2 * count / (len(grams) + count) < MIN_SIMILARITY:
+                break
+            dice = 2 * count / (len(grams) + gram_counts[key_id])
+            if dice >= MIN_SIMILARITY:
+                scored.append((dice, key_id))
+        if not scored:
+            return None
+        scored.sort(reverse=True)
+        distance, _, key_id = min(
+            (edit_distance(key, self._keys[key_id]), -dice, key_id) for dice, key_id in scored[:RERANK]
+        )
+        if distance > 1 + len(key) // TYPO_EVERY:
+            return None
+        return self._best(self._key_codes[key_id])
+
+    def _best(self, codes: List[str]) -> str:
+        """The code in the route network, else the first listed."""
+        return min(codes, key=lambda c: (c not in self._preferred, self._order[c]))
+
+@lru_cache(maxsize=1)
+def get_airport_resolver() -> AirportResolver:
+    """The process-wide resolver over AIRPORTS_FILE, preferring airports in the route network."""
+    routes = get_route_index()
+    return AirportResolver.from_file(AIRPORTS_FILE, set(routes.origins()) | set(routes.all_destinations()))
+
+def resolve_airport(text: str) -> str:
+    """The IATA code for a city or airport name as the user typed it.
+
+    Anything that does not resolve is returned upper-cased, for route
+    validation to reject.
+    """
+    return _resolve_cached(" ".join(str(text or "").split()))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _resolve_cached(text: str) -> str:
+    return get_airport_resolver().lookup(text) or text.upper()
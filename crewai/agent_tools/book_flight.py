@@ -1,25 +1,31 @@
-import stripe
-import os
+from typing import Any, Dict, List
 from dotenv import load_dotenv
+from agent_tools.booking import LOCAL_SESSION, get_booking_service
+from agent_tools.bulk_booking import book_flights_bulk as book_group
+from agent_tools.quotes import charge_amount
+from agent_tools.seats import SEAT_LOST, confirm_seats, hold_seats, release_seats
 
 load_dotenv(override=True)
-stripe.api_key = os.getenv("STRIPE_API_KEY")
 
-def book_flight(flight_id: str, price: str):
+def book_flight(flight_id: str, price: str, quote_id: str = ""):
     print(f"Booking flight {flight_id} for {price}...")
-    try:
-        amount = int(float(price.replace('$', '')) * 100)
-    except ValueError:
-        return {"error": "Invalid price format."}
+    amount, error = charge_amount(price, quote_id)
+    if error:
+        return {"error": error}
+
+    hold_id, error = hold_seats(quote_id, LOCAL_SESSION)
+    if error:
+        return {"error": error}
 
     try:
-        customer = stripe.Customer.create(source="tok_visa")
-        charge = stripe.Charge.create(
-            amount=amount,
-            currency="usd",
-            description=f"Flight booking for {flight_id}",
-            customer=customer.id,
-        )
-        return {"invoice_url": charge.receipt_url}
+        charge = get_booking_service().book(flight_id, amount, quote_id, session_id=LOCAL_SESSION)
     except Exception as e:
-        return {"error": f"Stripe error: {str(e)}"}
\ No newline at end of file
+        release_seats(hold_id)
+        return {"error": f"Stripe error: {str(e)}"}
+    if not confirm_seats(hold_id):
+        return {"invoice_url": charge.receipt_url, "warning": SEAT_LOST}
+    return {"invoice_url": charge.receipt_url}
+
+def book_flights_bulk(items: List[Dict[str, Any]]):
+    print(f"Booking {len(items)} seats...")
+    return book_group(items, session_id=LOCAL_SESSION)
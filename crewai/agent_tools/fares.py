@@ -0,0 +1,229 @@
+import argparse
+import datetime
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agent_tools.routes import get_route_index
+
+# Columnar fare inventory for find_flights.
+#
+# Fares live in one .npy file per column inside FARE_INVENTORY_DIR and are
+# memory-mapped, so a process only pages in the rows its queries touch. Rows
+# are sorted by (route_id, depart_day); route_offsets.npy holds where each
+# route's block starts, so a query slices one block and filters it with
+# vectorized masks. Days are counted from 1970-01-01.
+
+COLUMNS = {
+    "route_id": np.int32,
+    "depart_day": np.int32,
+    "return_day": np.int32,
+    "price_cents": np.int32,
+    "seats": np.int16,
+}
+EPOCH = datetime.date(1970, 1, 1)
+
+def to_day(date_str: str) -> int:
+    return (datetime.date.fromisoformat(date_str) - EPOCH).days
+
+def from_day(day: int) -> str:
+    return (EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+class FareInventory:
+    """Read-only, memory-mapped fare columns with per-route row offsets."""
+
+    def __init__(self, directory: str):
+        path = Path(directory)
+        with open(path / "routes.json") as f:
+            self.routes: List[Tuple[str, str]] = [tuple(r) for r in json.load(f)]
+        self._route_ids = {route: i for i, route in enumerate(self.routes)}
+        self.offsets = np.load(path / "route_offsets.npy")
+        self.columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["price_cents"])
+
+    def route_id(self, origin: str, destination: str) -> Optional[int]:
+        return self._route_ids.get((origin, destination))
+
+    def route_block(self, route_id: int, depart_from: int, depart_to: int) -> Tuple[int, int]:
+        """Row range of a route with depart_day in [depart_from, depart_to]."""
+        start, end = int(self.offsets[route_id]), int(self.offsets[route_id + 1])
+        departs = self.columns["depart_day"][start:end]
+        lo = start + int(np.searchsorted(departs, depart_from, side="left"))
+        hi = start + int(np.searchsorted(departs, depart_to, side="right"))
+        return lo, hi
+
+    def query(
+        self,
+        origin: str,
+        destination: str,
+        depart_from: int,
+        depart_to: Optional[int] = None,
+        return_from: Optional[int] = None,
+        return_to: Optional[int] = None,
+        min_price_cents: int = 0,
+        max_price_cents: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """Row numbers of bookable fares matching the filters, cheapest first."""
+        route_id = self.route_id(origin, destination)
+        if route_id is None:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = self.route_block(route_id, depart_from, depart_from if depart_to is None else depart_to)
+        return self._select(lo, hi, return_from, return_to, min_price_cents, max_price_cents, limit)
+
+    def iter_fares(
+        self,
+        origin: str,
+        destination: str,
+        depart_from: int,
+        depart_to: Optional[int] = None,
+        return_from: Optional[int] = None,
+        return_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        chunk_rows: int = 65536,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching fares a chunk of rows at a time.
+
+        Each chunk is cut to its `limit` cheapest fares, so feeding this to
+        heapq.nsmallest(limit, ...) finds the overall cheapest without
+        sorting, or building records for, the whole route block.
+        """
+        route_id = self.route_id(origin, destination)
+        if route_id is None:
+            return
+        lo, hi = self.route_block(route_id, depart_from, depart_from if depart_to is None else depart_to)
+        for start in range(lo, hi, chunk_rows):
+            rows = self._select(start, min(start + chunk_rows, hi), return_from, return_to, 0, None, limit)
+            yield from self.records(rows)
+
+    def _select(
+        self,
+        lo: int,
+        hi: int,
+        return_from: Optional[int],
+        return_to: Optional[int],
+        min_price_cents: int,
+        max_price_cents: Optional[int],
+        limit: Optional[int],
+    ) -> np.ndarray:
+        prices = self.columns["price_cents"][lo:hi]
+        mask = self.columns["seats"][lo:hi] > 0
+        if return_from is not None:
+            returns = self.columns["return_day"][lo:hi]
+            mask &= returns >= return_from
+            mask &= returns <= (return_from if return_to is None else return_to)
+        if min_price_cents:
+            mask &= prices >= min_price_cents
+        if max_price_cents is not None:
+            mask &= prices <= max_price_cents
+        rows = np.flatnonzero(mask)
+        if limit is not None and len(rows) > limit:
+            # Partial sort, only the cheapest `limit` rows get ordered
+            rows = rows[np.argpartition(prices[rows], limit - 1)[:limit]]
+        return lo + rows[np.argsort(prices[rows], kind="stable")]
+
+    def records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Plain dicts for the given rows."""
+        cols = {name: self.columns[name][rows] for name in COLUMNS}
+        return [
+            {
+                "origin": self.routes[cols["route_id"][i]][0],
+                "destination": self.routes[cols["route_id"][i]][1],
+                "departure_date": from_day(cols["depart_day"][i]),
+                "return_date": from_day(cols["return_day"][i]),
+                "price": f"{cols['price_cents'][i] / 100:.2f}",
+                "seats": int(cols["seats"][i]),
+            }
+            for i in range(len(rows))
+        ]
+
+    def search(self, origin: str, destination: str, depart: str, ret: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Cheapest fares for an exact date pair, in the find_flights shape."""
+        rows = self.query(
+            origin, destination, to_day(depart),
+            return_from=to_day(ret), limit=limit,
+        )
+        flights = []
+        for i, record in enumerate(self.records(rows), start=1):
+            flights.append({"id": str(i), **record, "currency": "USD"})
+        return flights
+
+@lru_cache(maxsize=1)
+def get_fare_inventory() -> Optional[FareInventory]:
+    """Inventory from FARE_INVENTORY_DIR, or None to keep the mock prices."""
+    directory = os.getenv("FARE_INVENTORY_DIR")
+    return FareInventory(directory) if directory else None
+
+def generate_inventory(
+    directory: str,
+    routes: Sequence[Tuple[str, str]],
+    start: datetime.date,
+    days: int = 365,
+    trip_lengths: Sequence[int] = (3, 5, 7, 10, 14),
+    fares_per_trip: int = 3,
+    seed: int = 0,
+) -> int:
+    """Write a synthetic inventory, one route at a time to keep memory flat.
+
+    Returns the number of fares written.
+    """
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    per_route = days * len(trip_lengths) * fares_per_trip
+    total = per_route * len(routes)
+    columns = {
+        name: np.lib.format.open_memmap(path / f"{name}.npy", mode="w+", dtype=dtype, shape=(total,))
+        for name, dtype in COLUMNS.items()
+    }
+    rng = np.random.default_rng(seed)
+    first_day = (start - EPOCH).days
+    departs = np.repeat(np.arange(first_day, first_day + days, dtype=np.int32), len(trip_lengths) * fares_per_trip)
+    lengths = np.tile(np.repeat(np.asarray(trip_lengths, dtype=np.int32), fares_per_trip), days)
+    for route_id in range(len(routes)):
+        block = slice(route_id * per_route, (route_id + 1) * per_route)
+        base = rng.uniform(150, 900)
+        columns["route_id"][block] = route_id
+        columns["depart_day"][block] = departs
+        columns["return_day"][block] = departs + lengths
+        columns["price_cents"][block] = (base * rng.uniform(0.7, 1.6, per_route) * 100).astype(np.int32)
+        columns["seats"][block] = rng.integers(0, 10, per_route, dtype=np.int16)
+    for column in columns.values():
+        column.flush()
+    np.save(path / "route_offsets.npy", np.arange(len(routes) + 1, dtype=np.int64) * per_route)
+    with open(path / "routes.json", "w") as f:
+        json.dump([list(r) for r in routes], f)
+    return total
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic fare inventory for FARE_INVENTORY_DIR.")
+    parser.add_argument("directory")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--trip-lengths", default="3,5,7,10,14")
+    parser.add_argument("--fares-per-trip", type=int, default=3)
+    parser.add_argument("--start", default=datetime.date.today().isoformat(), help="first departure date")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Routes come from ROUTES_FILE, or the mock routes
+    routes = sorted(get_route_index().pairs)
+    total = generate_inventory(
+        args.directory,
+        routes,
+        datetime.date.fromisoformat(args.start),
+        days=args.days,
+        trip_lengths=[int(n) for n in args.trip_lengths.split(",")],
+        fares_per_trip=args.fares_per_trip,
+        seed=args.seed,
+    )
+    print(f"Wrote {total} fares for {len(routes)} routes to {args.directory}")
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,32 @@
-import random
-import datetime
-import dateparser
+from agent_tools.airports import resolve_airport
+from agent_tools.dates import parse_date
+from agent_tools.routes import get_route_index
+from agent_tools.route_graph import clamp_stops
+from agent_tools.search import page_from_cursor, search_page
 
-MOCK_ROUTES = [
-    {"origin": "LAX", "destination": "NYC"},
-    {"origin": "LAX", "destination": "MUC"},
-    {"origin": "LAX", "destination": "SFO"},
-    {"origin": "LAX", "destination": "CDG"},
-    {"origin": "LAX", "destination": "ORD"},
-]
-
-def parse_date(date_str: str) -> str:
-    dt = dateparser.parse(
-        date_str,
-        settings={
-            "PREFER_DATES_FROM": "future",
-            "RELATIVE_BASE": datetime.datetime.now()
-        }
-    )
-    return dt.strftime("%Y-%m-%d") if dt else None
-
-def find_flights(origin: str, destination: str, departure_date: str, return_date: str):
+def find_flights(origin: str, destination: str, departure_date: str, return_date: str, cursor: str = "", max_stops: int = 0):
     print(f"[find_flights] Called with: {origin=}, {destination=}, {departure_date=}, {return_date=}")
-    origin_code = origin.strip().upper()
-    destination_code = destination.strip().upper()
+
+    if cursor:
+        # "Show more": the next page of an earlier search
+        return page_from_cursor(cursor)
+    origin_code = resolve_airport(origin)
+    destination_code = resolve_airport(destination)
     depart = parse_date(departure_date)
     ret = parse_date(return_date)
     print(f"[find_flights] Parsed dates: {depart=} {ret=}")
     if not depart or not ret:
         return {"error": "Could not parse one or both dates."}
-    if not any(r["origin"] == origin_code and r["destination"] == destination_code for r in MOCK_ROUTES):
+    routes = get_route_index()
+    max_stops = clamp_stops(max_stops)
+    # With max_stops the route graph looks for connections instead
+    if not max_stops and not routes.is_valid(origin_code, destination_code):
         return {
-            "error": "We currently only support mock routes from LAX to a few destinations.",
-            "supported_destinations": [r["destination"] for r in MOCK_ROUTES if r["origin"] == "LAX"]
+            "error": f"No direct route from {origin_code} to {destination_code}.",
+            "supported_destinations": list(routes.destinations_from(origin_code) or routes.destinations_from("LAX")),
+            "hint": "Search with max_stops=1 or 2 to include connecting flights."
         }
-    flights = []
-    for i in range(1, 4):
-        price = round(random.uniform(300, 500), 2)
-        flights.append({
-            "id": str(i),
-            "origin": origin_code,
-            "destination": destination_code,
-            "departure_date": depart,
-            "return_date": ret,
-            "price": f"{price:.2f}",
-            "currency": "USD"
-        })
-    print(f"[find_flights] Returning {len(flights)} flights")
-    return flights
\ No newline at end of file
+    # First page of the cheapest fares, the rest stay cached behind next_cursor
+    result = search_page((origin_code, destination_code, depart, ret, max_stops))
+    print(f"[find_flights] Returning {len(result.get('flights', []))} flights")
+    return result
\ No newline at end of file
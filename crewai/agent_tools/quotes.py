@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from agent_tools.records import Flight
+
+# Fare quote cache shared by find_flights and book_flight.
+#
+# Search results are cached per (origin, destination, departure, return, max
+# stops) so a repeated search returns the same prices, and every flight gets a
+# stable quote_id. book_flight charges the quoted price for a quote_id instead
+# of trusting a free-form price string. QUOTE_CACHE_BACKEND picks the
+# in-process LRU ("memory", default) or SQLite ("sqlite", shared by worker
+# processes on one host, stored at QUOTE_CACHE_PATH). Flights are kept as
+# Flight records and stored as their dicts in SQLite.
+
+# (origin, destination, departure date, return date, max stops)
+SearchKey = Tuple[str, str, str, str, int]
+
+def quote_id_for(key: SearchKey, flight: Flight) -> str:
+    """Stable id for a flight of a search: the same search and fare give the same id."""
+    raw = "|".join(str(part) for part in key + (flight.id, flight.price))
+    return "Q" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12].upper()
+
+def _with_quote_ids(key: SearchKey, flights: List[Flight]) -> List[Flight]:
+    return [f if f.quote_id else f.replace(quote_id=quote_id_for(key, f)) for f in flights]
+
+class QuoteCache:
+    """Thread-safe in-process LRU of search results with a TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 900):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._searches: "OrderedDict[SearchKey, Tuple[float, List[Flight]]]" = OrderedDict()
+        self._quotes: Dict[str, Tuple[SearchKey, int]] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: SearchKey) -> Optional[List[Flight]]:
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._searches.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key: SearchKey, flights: List[Flight]) -> List[Flight]:
+        """Cache a search result and return it with quote ids added."""
+        flights = _with_quote_ids(key, flights)
+        with self._lock:
+            self._drop(key)
+            self._searches[key] = (time.monotonic() + self.ttl, flights)
+            for i, flight in enumerate(flights):
+                self._quotes[flight.quote_id] = (key, i)
+            while len(self._searches) > self.max_size:
+                self._drop(next(iter(self._searches)))
+                self._stats["evictions"] += 1
+        return flights
+
+    def get_quote(self, quote_id: str) -> Optional[Flight]:
+        with self._lock:
+            ref = self._quotes.get(quote_id)
+            if ref is None:
+                return None
+            flights = self._live_entry(ref[0])
+            return flights[ref[1]] if flights else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._searches)}
+
+    def _live_entry(self, key: SearchKey) -> Optional[List[Flight]]:
+        entry = self._searches.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            self._stats["expirations"] += 1
+            return None
+        return entry[1]
+
+    def _drop(self, key: SearchKey) -> None:
+        entry = self._searches.pop(key, None)
+        if entry:
+            for flight in entry[1]:
+                self._quotes.pop(flight.quote_id, None)
+
+class SqliteQuoteCache:
+    """The same cache in a SQLite file, shared by processes on one host."""
+
+    def __init__(self, path: str, max_size: int = 1024, ttl: float = 900):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            "search_key TEXT PRIMARY KEY, flights TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quotes ("
+            "quote_id TEXT PRIMARY KEY, search_key TEXT NOT NULL, flight TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS searches_last_used ON searches (last_used)")
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: SearchKey) -> Optional[List[Flight]]:
+        search_key = json.dumps(key)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT flights, expires_at FROM searches WHERE search_key = ?", (search_key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            if row[1] < now:
+                self._delete(search_key)
+                self._stats["misses"] += 1
+                self._stats["expirations"] += 1
+                return None
+            self._conn.execute("UPDATE searches SET last_used = ? WHERE search_key = ?", (now, search_key))
+            self._stats["hits"] += 1
+            return [Flight.from_dict(f) for f in json.loads(row[0])]
+
+    def put(self, key: SearchKey, flights: List[Flight]) -> List[Flight]:
+        flights = _with_quote_ids(key, flights)
+        search_key = json.dumps(key)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM quotes WHERE search_key = ?", (search_key,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)",
+                    (search_key, json.dumps([f.to_dict() for f in flights]), now + self.ttl, now),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO quotes VALUES (?, ?, ?)",
+                    [(f.quote_id, search_key, json.dumps(f.to_dict())) for f in flights],
+                )
+                evicted = self._conn.execute(
+                    "SELECT search_key FROM searches ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                    (self.max_size,),
+                ).fetchall()
+                for (old_key,) in evicted:
+                    self._delete(old_key)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._stats["evictions"] += len(evicted)
+        return flights
+
+    def get_quote(self, quote_id: str) -> Optional[Flight]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT q.flight FROM quotes q JOIN searches s ON s.search_key = q.search_key "
+                "WHERE q.quote_id = ? AND s.expires_at >= ?",
+                (quote_id, time.time()),
+            ).fetchone()
+        return Flight.from_dict(json.loads(row[0])) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+            return {**self._stats, "size": size}
+
+    def _delete(self, search_key: str) -> None:
+        self._conn.execute("DELETE FROM quotes WHERE search_key = ?", (search_key,))
+        self._conn.execute("DELETE FROM searches WHERE search_key = ?", (search_key,))
+
+@lru_cache(maxsize=1)
+def get_quote_cache():
+    """The process-wide quote cache configured by the QUOTE_CACHE_* variables."""
+    max_size = int(os.getenv("QUOTE_CACHE_SIZE", "1024"))
+    ttl = float(os.getenv("QUOTE_CACHE_TTL", "900"))
+    if os.getenv("QUOTE_CACHE_BACKEND", "memory") == "sqlite":
+        return SqliteQuoteCache(os.getenv("QUOTE_CACHE_PATH", "quotes.db"), max_size=max_size, ttl=ttl)
+    return QuoteCache(max_size=max_size, ttl=ttl)
+
+def charge_amount(price: str, quote_id: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+    """Amount in cents to charge for a booking, or an error message.
+
+    With a quote_id the cached quote sets the amount, and a given price must
+    match it. Without one the price string is parsed as before.
+    """
+    if quote_id:
+        quote = get_quote_cache().get_quote(quote_id)
+        if quote is None:
+            return None, "Quote expired or unknown, please search again."
+        amount = round(float(quote.price) * 100)
+        if price:
+            try:
+                if round(float(str(price).replace('$', '')) * 100) != amount:
+                    return None, f"Price does not match quote {quote_id} (${quote.price})."
+            except ValueError:
+                return None, "Invalid price format."
+        return amount, None
+    try:
+        return int(float(str(price).replace('$', '')) * 100), None
+    except ValueError:
+        return None, "Invalid price format."
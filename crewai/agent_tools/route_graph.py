@@ -0,0 +1,222 @@
+import bisect
+import hashlib
+import heapq
+import itertools
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from agent_tools.fares import get_fare_inventory, to_day
+from agent_tools.routes import RouteIndex, get_route_index
+
+# Connecting itineraries over the route network.
+#
+# Every route is an edge with a base fare and a daily schedule. Adjacency
+# lists are built once per route index, outgoing edges sorted by fare, so a
+# search walks the cheapest first hops and stops as soon as a path can no
+# longer beat the k-th best itinerary found so far. Connections must leave
+# at least MIN_CONNECTION_MINUTES and at most MAX_CONNECTION_MINUTES after
+# the previous leg lands. Base fares are the cheapest fare of the route in the
+# fare inventory, or synthetic; schedules are synthetic (seeded per route).
+
+MAX_STOPS = 2
+MIN_CONNECTION_MINUTES = int(os.getenv("MIN_CONNECTION_MINUTES", "60"))
+MAX_CONNECTION_MINUTES = int(os.getenv("MAX_CONNECTION_MINUTES", "720"))
+DAY = 24 * 60
+
+class Leg(NamedTuple):
+    origin: str
+    destination: str
+    fare_cents: int
+    # Daily departures in minutes after midnight, sorted
+    departures: Tuple[int, ...]
+    duration: int
+
+def synthetic_leg(origin: str, destination: str, fare_cents: Optional[int] = None) -> Leg:
+    """A route with 2-4 daily departures between 06:00 and 23:00, the same every run."""
+    # Cheaper than seeding a random.Random per route on large networks
+    bits = int.from_bytes(hashlib.blake2b(f"{origin}-{destination}".encode("utf-8"), digest_size=16).digest(), "big")
+    bits, count = divmod(bits, 3)
+    departures = set()
+    for _ in range(count + 2):
+        bits, slot = divmod(bits, 17 * 12)
+        departures.add((6 * 12 + slot) * 5)
+    bits, duration = divmod(bits, 132)
+    if fare_cents is None:
+        fare_cents = 9000 + bits % 36000
+    return Leg(origin, destination, fare_cents, tuple(sorted(departures)), (12 + duration) * 5)
+
+class RouteGraph:
+    """Adjacency lists over the route index, cheapest edges first."""
+
+    def __init__(self, legs: List[Leg]):
+        outgoing: Dict[str, List[Leg]] = {}
+        self._incoming: Dict[str, Dict[str, Leg]] = {}
+        for leg in legs:
+            outgoing.setdefault(leg.origin, []).append(leg)
+            self._incoming.setdefault(leg.destination, {})[leg.origin] = leg
+        self._outgoing = {o: tuple(sorted(ls, key=lambda l: l.fare_cents)) for o, ls in outgoing.items()}
+        self._incoming_sorted = {
+            d: tuple(sorted(ls.values(), key=lambda l: l.fare_cents)) for d, ls in self._incoming.items()
+        }
+        # Lower bound of the last hop into each airport, for pruning
+        self._cheapest_in = {d: ls[0].fare_cents for d, ls in self._incoming_sorted.items()}
+
+    @classmethod
+    def from_index(cls, index: RouteIndex, base_fares: Optional[Dict[Tuple[str, str], int]] = None) -> "RouteGraph":
+        base_fares = base_fares or {}
+        return cls([synthetic_leg(o, d, base_fares.get((o, d))) for o, d in sorted(index.pairs)])
+
+    def __len__(self) -> int:
+        return len(set(self._outgoing) | set(self._incoming))
+
+    def leg(self, origin: str, destination: str) -> Optional[Leg]:
+        return self._incoming.get(destination, {}).get(origin)
+
+    def itineraries(
+        self,
+        origin: str,
+        destination: str,
+        max_stops: int = 1,
+        k: int = 5,
+        include_direct: bool = True,
+    ) -> List[Tuple[int, List[Leg], List[int]]]:
+        """The k cheapest itineraries by base fare with up to max_stops connections.
+
+        Returns (fare_cents, legs, departures) tuples, cheapest first, where
+        departures are minutes from midnight of the travel day.
+        """
+        if destination not in self._incoming:
+            return []
+        into = self._incoming[destination]
+        floor = self._cheapest_in[destination]
+        # Max-heap of the best k, as (-fare, -seq, legs, departures), and the
+        # fare an itinerary has to beat to get in
+        best: List[Tuple[int, int, List[Leg], List[int]]] = []
+        seq = itertools.count()
+        limit = float("inf")
+
+        def offer(legs: List[Leg], fare: int) -> float:
+            departures = schedule(legs)
+            if departures is not None:
+                entry = (-fare, -next(seq), legs, departures)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heapreplace(best, entry)
+            return -best[0][0] if len(best) == k else float("inf")
+
+        direct = into.get(origin)
+        if direct and include_direct:
+            limit = offer([direct], direct.fare_cents)
+        for first in self._outgoing.get(origin, ()):
+            if first.fare_cents + floor >= limit:
+                break
+            hub = first.destination
+            if hub == destination:
+                continue
+            last = into.get(hub)
+            if last and first.fare_cents + last.fare_cents < limit:
+                limit = offer([first, last], first.fare_cents + last.fare_cents)
+            if max_stops < 2:
+                continue
+            # Meet in the middle: pair the first hop with every last hop into
+            # the destination and look up the hop between them
+            for last in self._incoming_sorted[destination]:
+                fare = first.fare_cents + last.fare_cents
+                if fare >= limit:
+                    break
+                hub2 = last.origin
+                if hub2 == origin or hub2 == hub:
+                    continue
+                second = self._incoming.get(hub2, {}).get(hub)
+                if second and fare + second.fare_cents < limit:
+                    limit = offer([first, second, last], fare + second.fare_cents)
+        ranked = sorted(best, key=lambda e: (-e[0], len(e[2])))
+        return [(-fare, legs, departures) for fare, _, legs, departures in ranked]
+
+def clamp_stops(max_stops: Any) -> int:
+    """max_stops as passed by a tool call, limited to 0..MAX_STOPS."""
+    try:
+        return min(max(int(max_stops or 0), 0), MAX_STOPS)
+    except (TypeError, ValueError):
+        return 0
+
+def schedule(legs: List[Leg]) -> Optional[List[int]]:
+    """Departure times (minutes from the travel day's midnight) of the quickest valid connection."""
+    quickest: Optional[List[int]] = None
+    quickest_minutes = 0
+    for start in legs[0].departures:
+        times = [start]
+        arrival = start + legs[0].duration
+        for leg in legs[1:]:
+            ready = arrival + MIN_CONNECTION_MINUTES
+            day, minute = divmod(ready, DAY)
+            i = bisect.bisect_left(leg.departures, minute)
+            depart = day * DAY + (leg.departures[i] if i < len(leg.departures) else DAY + leg.departures[0])
+            if depart - arrival > MAX_CONNECTION_MINUTES:
+                break
+            times.append(depart)
+            arrival = depart + leg.duration
+        else:
+            if quickest is None or arrival - start < quickest_minutes:
+                quickest, quickest_minutes = times, arrival - start
+    return quickest
+
+def _clock(minutes: int) -> str:
+    day, minute = divmod(minutes, DAY)
+    return f"{minute // 60:02d}:{minute % 60:02d}" + (f" +{day}" if day else "")
+
+def connecting_flights(origin: str, destination: str, depart: str, ret: str, max_stops: int, k: int) -> Iterator[Dict[str, Any]]:
+    """Unranked connecting itineraries of a search, in the find_flights shape.
+
+    With a fare inventory each leg is priced at its cheapest fare for the
+    dates and itineraries with an unpriced leg are dropped.
+    """
+    inventory = get_fare_inventory()
+    # Direct flights come from the regular search
+    for fare, legs, departures in get_route_graph().itineraries(origin, destination, max_stops, k, include_direct=False):
+        if inventory is not None:
+            fares = []
+            for leg in legs:
+                rows = inventory.query(leg.origin, leg.destination, to_day(depart), return_from=to_day(ret), limit=1)
+                if not len(rows):
+                    break
+                fares.append(int(inventory.columns["price_cents"][rows[0]]))
+            if len(fares) < len(legs):
+                continue
+            fare = sum(fares)
+        arrival = departures[-1] + legs[-1].duration
+        yield {
+            "origin": origin,
+            "destination": destination,
+            "departure_date": depart,
+            "return_date": ret,
+            "price": f"{fare / 100:.2f}",
+            "stops": len(legs) - 1,
+            "via": [leg.destination for leg in legs[:-1]],
+            "legs": [
+                {"origin": leg.origin, "destination": leg.destination,
+                 "depart": _clock(t), "arrive": _clock(t + leg.duration)}
+                for leg, t in zip(legs, departures)
+            ],
+            "duration": f"{(arrival - departures[0]) // 60}h {(arrival - departures[0]) % 60:02d}m",
+        }
+
+def _inventory_base_fares() -> Dict[Tuple[str, str], int]:
+    """Cheapest fare of every route in the fare inventory, in one pass."""
+    inventory = get_fare_inventory()
+    if inventory is None or not len(inventory):
+        return {}
+    starts, ends = inventory.offsets[:-1], inventory.offsets[1:]
+    # Routes are contiguous blocks, so the starts of non-empty ones delimit them
+    route_ids = np.flatnonzero(ends > starts)
+    fares = np.minimum.reduceat(inventory.columns["price_cents"], starts[route_ids])
+    return {inventory.routes[r]: int(f) for r, f in zip(route_ids, fares)}
+
+@lru_cache(maxsize=1)
+def get_route_graph() -> RouteGraph:
+    """The process-wide route graph over get_route_index(), built once."""
+    return RouteGraph.from_index(get_route_index(), _inventory_base_fares())
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import TypedDict, List, Any, Union
+from typing import TypedDict, List, Any, Dict, Union
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.agents import tool, create_tool_calling_agent
 from langchain_openai import ChatOpenAI
@@ -13,19 +13,35 @@ load_dotenv(override=True)
 
 # === Tools ===
 from agent_tools.find_flights import find_flights
-from agent_tools.book_flight import book_flight
+from agent_tools.book_flight import book_flight, book_flights_bulk
+from agent_tools.price_calendar import price_calendar
+from agent_tools.dates import warm_up
+from agent_tools.records import serialize_result
+
+# Load the date parser's locale data before the first search
+warm_up()
+
+@tool
+def find_flights_tool(origin: str, destination: str, departure_date: str, return_date: str, cursor: str = "", max_stops: int = 0):
+    """Find mock flights from Los Angeles using IATA airport codes or city names (e.g., LAX to NYC or New York). Direct flights go to NYC, MUC, SFO, CDG, ORD; set max_stops to 1 or 2 to include connecting flights elsewhere. Returns the cheapest page of flights; pass its next_cursor as cursor to show more."""
+    return serialize_result(find_flights("LAX", destination, departure_date, return_date, cursor, max_stops))
+
+@tool
+def book_flight_tool(flight_id: str, price: str, quote_id: str = ""):
+    """Book a selected flight using Stripe API. Pass the quote_id returned by find_flights_tool so the quoted price is charged."""
+    return book_flight(flight_id, price, quote_id)
 
 @tool
-def find_flights_tool(origin: str, destination: str, departure_date: str, return_date: str):
-    """Find mock flights from Los Angeles using IATA airport codes (e.g., LAX to NYC). Only LAX to NYC, MUC, SFO, CDG, ORD are supported."""
-    return find_flights("LAX", destination, departure_date, return_date)
+def book_flights_bulk_tool(items: List[Dict[str, str]]):
+    """Book seats for a group in one call: one item per passenger with passenger and the quote_id of the chosen flight (or flight_id and price). Returns every booking and every failed item."""
+    return serialize_result(book_flights_bulk(items))
 
 @tool
-def book_flight_tool(flight_id: str, price: str):
-    """Book a selected flight using Stripe API."""
-    return book_flight(flight_id, price)
+def price_calendar_tool(origin: str, destination: str, month: str, trip_length: int):
+    """Find the cheapest departure and return dates in a month (name or YYYY-MM) for a trip of about trip_length nights, e.g. the cheapest week in June. Use find_flights_tool on the chosen dates to get bookable flights."""
+    return serialize_result(price_calendar("LAX", destination, month, trip_length))
 
-tools = [find_flights_tool, book_flight_tool]
+tools = [find_flights_tool, book_flight_tool, book_flights_bulk_tool, price_calendar_tool]
 
 # === LLM Setup ===
 llm = ChatOpenAI(
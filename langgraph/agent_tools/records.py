@@ -0,0 +1,115 @@
+import dataclasses
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Flight records and the compact tool-result format sent to the LLM.
+#
+# Flight is a slotted dataclass, so the quote cache holds a fixed set of
+# attributes per flight instead of a dict. Tool results are serialized as a
+# shared header with the fields every row has in common, then one
+# "|"-separated row per flight, instead of JSON that repeats every key and
+# value on every row. Tool functions keep returning plain dicts; only what
+# goes into the prompt is compacted.
+
+@dataclass(slots=True, frozen=True)
+class Flight:
+    id: str
+    origin: str
+    destination: str
+    departure_date: str
+    return_date: str
+    price: str
+    currency: str = "USD"
+    seats: Optional[int] = None
+    quote_id: str = ""
+    stops: int = 0
+    via: Tuple[str, ...] = ()
+    duration: str = ""
+    legs: Tuple[Dict[str, str], ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Flight":
+        values = {name: data[name] for name in FLIGHT_FIELDS if name in data}
+        for name in ("via", "legs"):
+            if name in values:
+                values[name] = tuple(values[name])
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The find_flights dict, leaving out fields still at their default."""
+        data = {}
+        for name in FLIGHT_FIELDS:
+            value = getattr(self, name)
+            if name in _DEFAULTS and value == _DEFAULTS[name]:
+                continue
+            data[name] = list(value) if isinstance(value, tuple) else value
+        return data
+
+    def replace(self, **changes: Any) -> "Flight":
+        return dataclasses.replace(self, **changes)
+
+FLIGHT_FIELDS = tuple(f.name for f in dataclasses.fields(Flight))
+_DEFAULTS = {
+    f.name: f.default for f in dataclasses.fields(Flight)
+    if f.default is not dataclasses.MISSING and f.name != "currency"
+}
+
+def table(rows: List[Dict[str, Any]], title: str = "") -> str:
+    """Rows as a header of shared fields and a "|"-separated table of the rest.
+
+    Lists of strings are joined with "/", nested records (connection legs)
+    are left out.
+    """
+    if not rows:
+        return f"{title}: none" if title else "none"
+    columns: List[str] = []
+    for row in rows:
+        for name, value in row.items():
+            if name not in columns and not _nested(value):
+                columns.append(name)
+    first = rows[0]
+    shared = [
+        name for name in columns
+        if len(rows) > 1 and all(name in row and row[name] == first[name] for row in rows)
+    ]
+    varying = [name for name in columns if name not in shared]
+    lines = []
+    header = " ".join(f"{name}={_cell(first[name])}" for name in shared)
+    if title or header:
+        lines.append(" ".join(part for part in (title, header) if part))
+    lines.append("|".join(varying))
+    for row in rows:
+        lines.append("|".join(_cell(row.get(name, "")) for name in varying))
+    return "\n".join(lines)
+
+def serialize_result(result: Any) -> str:
+    """Compact text for a tool result in the prompt."""
+    if isinstance(result, dict) and isinstance(result.get("flights"), list):
+        text = table(result["flights"], "flights")
+        if result.get("next_cursor"):
+            text += f"\nnext_cursor={result['next_cursor']}"
+        if result.get("error"):
+            text += f"\nerror={result['error']}"
+        return text
+    if isinstance(result, dict) and isinstance(result.get("cheapest"), list):
+        scope = {k: v for k, v in result.items() if k != "cheapest"}
+        title = "cheapest_dates " + " ".join(f"{k}={_cell(v)}" for k, v in scope.items())
+        return table(result["cheapest"], title)
+    if isinstance(result, list) and result and all(isinstance(r, dict) for r in result):
+        return table(result)
+    if isinstance(result, (dict, list)):
+        return json.dumps(result, separators=(",", ":"))
+    return str(result)
+
+def _nested(value: Any) -> bool:
+    return isinstance(value, dict) or (
+        isinstance(value, (list, tuple)) and any(isinstance(v, dict) for v in value)
+    )
+
+def _cell(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return "/".join(str(v) for v in value)
+    if value is None:
+        return ""
+    return str(value).replace("|", "/").replace("\n", " ")
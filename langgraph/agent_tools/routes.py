@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# Route network for find_flights. ROUTES_FILE may point at a CSV (origin and
+# destination columns) or JSON file (a list of {"origin", "destination"}
+# objects or [origin, destination] pairs), otherwise the mock routes are used.
+
+MOCK_ROUTES = [
+    {"origin": "LAX", "destination": "NYC"},
+    {"origin": "LAX", "destination": "MUC"},
+    {"origin": "LAX", "destination": "SFO"},
+    {"origin": "LAX", "destination": "CDG"},
+    {"origin": "LAX", "destination": "ORD"},
+    # Onward routes from the hubs, for connecting itineraries
+    {"origin": "NYC", "destination": "LHR"},
+    {"origin": "NYC", "destination": "MUC"},
+    {"origin": "ORD", "destination": "MUC"},
+    {"origin": "ORD", "destination": "DUB"},
+    {"origin": "SFO", "destination": "NRT"},
+    {"origin": "SFO", "destination": "HNL"},
+    {"origin": "CDG", "destination": "FCO"},
+    {"origin": "CDG", "destination": "BCN"},
+    {"origin": "MUC", "destination": "VIE"},
+    {"origin": "LHR", "destination": "DUB"},
+    {"origin": "NRT", "destination": "SYD"}
+]
+
+class RouteIndex:
+    """Hashed route lookups with destinations precomputed per origin."""
+
+    def __init__(self, routes: Iterable[Tuple[str, str]]):
+        by_origin: Dict[str, List[str]] = {}
+        pairs = set()
+        for origin, destination in routes:
+            pair = (origin.strip().upper(), destination.strip().upper())
+            if pair not in pairs:
+                pairs.add(pair)
+                by_origin.setdefault(pair[0], []).append(pair[1])
+        self.pairs = frozenset(pairs)
+        self._by_origin = {origin: tuple(dests) for origin, dests in by_origin.items()}
+        self._destinations = tuple(dict.fromkeys(d for dests in by_origin.values() for d in dests))
+
+    @classmethod
+    def from_dicts(cls, routes: Iterable[Dict[str, str]]) -> "RouteIndex":
+        return cls((r["origin"], r["destination"]) for r in routes)
+
+    @classmethod
+    def from_file(cls, path: str) -> "RouteIndex":
+        if path.lower().endswith(".json"):
+            with open(path) as f:
+                data = json.load(f)
+            return cls(
+                (r["origin"], r["destination"]) if isinstance(r, dict) else (r[0], r[1])
+                for r in data
+            )
+        with open(path, newline="") as f:
+            return cls((row["origin"], row["destination"]) for row in csv.DictReader(f))
+
+    def is_valid(self, origin: str, destination: str) -> bool:
+        return (origin, destination) in self.pairs
+
+    def destinations_from(self, origin: str) -> Tuple[str, ...]:
+        """Destinations served from an origin, in file order."""
+        return self._by_origin.get(origin, ())
+
+    def origins(self) -> Tuple[str, ...]:
+        return tuple(self._by_origin)
+
+    def all_destinations(self) -> Tuple[str, ...]:
+        return self._destinations
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+@lru_cache(maxsize=1)
+def get_route_index() -> RouteIndex:
+    """The process-wide route index, loaded once from ROUTES_FILE or the mock routes."""
+    path = os.getenv("ROUTES_FILE")
+    if path:
+        return RouteIndex.from_file(path)
+    return RouteIndex.from_dicts(MOCK_ROUTES)
@@ -1,14 +1,14 @@
+from typing import List
+from pydantic import BaseModel
 from agents import Agent, function_tool
 from agent_tools.find_flights import find_flights
-from agent_tools.book_flight import book_flight
+from agent_tools.book_flight import book_flight_async, book_flights_bulk_async
+from agent_tools.price_calendar import price_calendar
+from agent_tools.dates import warm_up
+from agent_tools.records import serialize_result
 
-CITY_TO_IATA = {
-    "new york": "NYC",
-    "munich": "MUC",
-    "san francisco": "SFO",
-    "paris": "CDG",
-    "chicago": "ORD",
-}
+# Load the date parser's locale data before the first search
+warm_up()
 
 @function_tool
 def find_flights_tool(
@@ -16,33 +16,62 @@ def find_flights_tool(
     departure_date: str,
     return_date: str,
     origin: str = "LAX",
-) -> dict:
-    """Find mock flights from LAX to supported destinations."""
-    dest_code = CITY_TO_IATA.get(destination.strip().lower(), destination.strip().upper())
-    return find_flights(origin, dest_code, departure_date, return_date)
+    cursor: str = "",
+    max_stops: int = 0,
+) -> str:
+    """Find mock flights from LAX to supported destinations, cheapest first. Pass next_cursor as cursor to show more, and max_stops (1 or 2) to include connecting flights."""
+    return serialize_result(find_flights(origin, destination, departure_date, return_date, cursor, max_stops))
 
 @function_tool
-def book_flight_tool(flight_id: str, price: str) -> dict:
-    return book_flight(flight_id, price)
+async def book_flight_tool(flight_id: str, price: str, quote_id: str = "") -> dict:
+    # Awaited on the agent's event loop instead of blocking it
+    return await book_flight_async(flight_id, price, quote_id)
+
+# Strict tool schemas need every field, the price check skips an empty price
+class BookingItem(BaseModel):
+    passenger: str
+    quote_id: str
+    flight_id: str
+    price: str
+
+@function_tool
+async def book_flights_bulk_tool(items: List[BookingItem]) -> str:
+    """Book seats for a group in one call, one item per passenger with the quote_id of the chosen flight. Returns every booking and every failed item."""
+    return serialize_result(await book_flights_bulk_async([item.model_dump() for item in items]))
+
+@function_tool
+def price_calendar_tool(
+    destination: str,
+    month: str,
+    trip_length: int,
+    origin: str = "LAX",
+) -> str:
+    """Find the cheapest departure and return dates in a month (name or YYYY-MM) for a trip of about trip_length nights. Use find_flights_tool on the chosen dates to get bookable flights."""
+    return serialize_result(price_calendar(origin, destination, month, trip_length))
 
 agent = Agent(
     name="LA Airline Agent",
     instructions="""
     You are a helpful airline assistant. All flights depart from LAX.
 
-    1) When the user gives a city name, you may pass either the city name
-    or its IATA code; the tool wrapper will translate it.
+    1) Pass destinations as the user wrote them, city name or IATA code;
+    the tools resolve names and typos themselves. For flexible
+    dates ("the cheapest week in June") call price_calendar_tool first,
+    then find_flights_tool on the dates the user picks.
 
     2) After find_flights_tool returns, list each option as
     “Flight ID: N – $price” and ask the user to reply with just the ID
     number.
 
     3) When the next user turn is only that number, look it up in
-    `flights` (in context) and call book_flight_tool(flight_id, price).
+    `flights` (in context) and call book_flight_tool(flight_id, price, quote_id).
+
+    For a group, collect every passenger's name and call
+    book_flights_bulk_tool once with an item per passenger instead.
 
     4) If booking succeeds, reply with:
     ✅ Your flight is booked! Invoice: {invoice_url}
     """,
-    tools=[find_flights_tool, book_flight_tool],
+    tools=[find_flights_tool, book_flight_tool, book_flights_bulk_tool, price_calendar_tool],
     model="gpt-4o",
 )
\ No newline at end of file
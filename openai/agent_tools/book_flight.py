@@ -1,39 +1,88 @@
-import stripe
-import os
+from typing import Any, Dict, List
 from dotenv import load_dotenv
+from agent_tools.booking import LOCAL_SESSION, get_booking_service
+from agent_tools.bulk_booking import book_flights_bulk_async as book_group_async
+from agent_tools.quotes import charge_amount
+from agent_tools.seats import SEAT_LOST, confirm_seats, hold_seats, release_seats
 
 load_dotenv()
-stripe.api_key = os.getenv("STRIPE_API_KEY")
 
-def book_flight(flight_id: str, price: str):
-    print(f"[book_flight] Called with: flight_id={flight_id}, price={price}")
+def book_flight(flight_id: str, price: str, quote_id: str = ""):
+    print(f"[book_flight] Called with: flight_id={flight_id}, price={price}, quote_id={quote_id}")
 
-    try:
-        amount = int(float(price.replace('$', '')) * 100)
-    except ValueError:
-        result = {"status": "error", "message": "Invalid price format."}
+    amount, error = charge_amount(price, quote_id)
+    if error:
+        result = {"status": "error", "message": error}
+        print(f"[book_flight] Returning: {result}")
+        return result
+
+    # Hold the seat while charging, so no other session sells it meanwhile
+    hold_id, error = hold_seats(quote_id, LOCAL_SESSION)
+    if error:
+        result = {"status": "error", "message": error}
         print(f"[book_flight] Returning: {result}")
         return result
 
     try:
-        customer = stripe.Customer.create(source="tok_visa")
-        charge = stripe.Charge.create(
-            amount=amount,
-            currency='usd',
-            description=f"Flight booking for {flight_id}",
-            customer=customer.id
-        )
-
-        result = {
-            "status": "success",
-            "invoice_url": charge["receipt_url"],
-            "flight_id": flight_id,
-            "price": price
-        }
+        charge = get_booking_service().book(flight_id, amount, quote_id, session_id=LOCAL_SESSION)
+    except Exception as e:
+        release_seats(hold_id)
+        result = {"status": "error", "message": f"Booking failed: {str(e)}"}
         print(f"[book_flight] Returning: {result}")
         return result
 
+    result = {
+        "status": "success",
+        "invoice_url": charge["receipt_url"],
+        "flight_id": flight_id,
+        "price": price
+    }
+    if not confirm_seats(hold_id):
+        result["warning"] = SEAT_LOST
+    print(f"[book_flight] Returning: {result}")
+    return result
+
+async def book_flight_async(flight_id: str, price: str, quote_id: str = ""):
+    """book_flight for the agent's event loop, on the pooled async Stripe client."""
+    print(f"[book_flight] Called with: flight_id={flight_id}, price={price}, quote_id={quote_id}")
+
+    amount, error = charge_amount(price, quote_id)
+    if error:
+        result = {"status": "error", "message": error}
+        print(f"[book_flight] Returning: {result}")
+        return result
+
+    # Hold the seat while charging, so no other session sells it meanwhile
+    hold_id, error = hold_seats(quote_id, LOCAL_SESSION)
+    if error:
+        result = {"status": "error", "message": error}
+        print(f"[book_flight] Returning: {result}")
+        return result
+
+    try:
+        charge = await get_booking_service().book_async(flight_id, amount, quote_id, session_id=LOCAL_SESSION)
     except Exception as e:
+        release_seats(hold_id)
         result = {"status": "error", "message": f"Booking failed: {str(e)}"}
         print(f"[book_flight] Returning: {result}")
-        return result
\ No newline at end of file
+        return result
+
+    result = {
+        "status": "success",
+        "invoice_url": charge["receipt_url"],
+        "flight_id": flight_id,
+        "price": price
+    }
+    if not confirm_seats(hold_id):
+        result["warning"] = SEAT_LOST
+    print(f"[book_flight] Returning: {result}")
+    return result
+
+async def book_flights_bulk_async(items: List[Dict[str, Any]]):
+    """Book a group's (quote, passenger) items in one call, on the pooled async Stripe client."""
+    print(f"[book_flights_bulk] Called with {len(items)} items")
+
+    result = await book_group_async(items, session_id=LOCAL_SESSION)
+    print(f"[book_flights_bulk] Returning: status={result.get('status', 'error')}, "
+          f"booked={result.get('booked', 0)}, failed={result.get('failed', 0)}")
+    return result
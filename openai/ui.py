@@ -33,6 +33,9 @@ async def chat_agent(message: str, history):
     for step in getattr(result, "steps", []):
         tool = getattr(step, "tool_name", "")
         output = getattr(step, "output", {}) or {}
+        if not isinstance(output, dict):
+            # find_flights_tool returns the compact text of agent_tools.records
+            continue
 
         if tool == "find_flights_tool":
             flights = output.get("flights", [])
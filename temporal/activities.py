@@ -1,118 +1,209 @@
 import os
-import random
-from datetime import datetime as dt
-import dateparser
-import stripe
 from dotenv import load_dotenv
 from temporalio import activity
 from dotenv import load_dotenv
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_openai import ChatOpenAI
 from langchain.agents import tool, create_tool_calling_agent
 from langchain_core.agents import AgentFinish, AgentAction
+from langchain_core.callbacks import UsageMetadataCallbackHandler
 from typing import Any, Dict, List
+from metrics import record_token_usage
+from agent_tools.airports import resolve_airport
+from agent_tools.booking import booking_key, get_booking_service
+from agent_tools.bulk_booking import book_flights_bulk_async
+from agent_tools import seats
+from agent_tools.dates import parse_date
+from agent_tools.routes import get_route_index
+from agent_tools.route_graph import clamp_stops
+from agent_tools.quotes import charge_amount
+from agent_tools.search import page_from_cursor, search_page
+from agent_tools.records import serialize_result
+from agent_tools.price_calendar import price_calendar as build_price_calendar
 
 # Load OpenAI key for agent
 load_dotenv(override=True)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # Initialize LLM
 llm = ChatOpenAI(model="gpt-4", temperature=0, api_key=OPENAI_API_KEY)
-# Load environment variables
-stripe.api_key = os.getenv("STRIPE_API_KEY")
-
-# Mock routes
-MOCK_ROUTES = [
-    {"origin": "LAX", "destination": "NYC"},
-    {"origin": "LAX", "destination": "MUC"},
-    {"origin": "LAX", "destination": "SFO"},
-    {"origin": "LAX", "destination": "CDG"},
-    {"origin": "LAX", "destination": "ORD"}
-]
-
-# Helper for date parsing
-def parse_date(date_str: str) -> str:
-    dt_obj = dateparser.parse(
-        date_str,
-        settings={"PREFER_DATES_FROM": "future", "RELATIVE_BASE": dt.now()}
-    )
-    if not dt_obj:
-        return None
-    return dt_obj.strftime("%Y-%m-%d")
+
+# find_flights and price_calendar are synchronous (dateparser and the fare
+# inventory block), the worker runs them on its activity thread pool.
+# book_flight awaits the pooled async Stripe client on the event loop.
 
 # Find flights activity
 @activity.defn
-async def find_flights(origin: str, destination: str, departure_date: str, return_date: str) -> Any:
-    origin_code = origin.strip().upper()
-    destination_code = destination.strip().upper()
+def find_flights(origin: str, destination: str, departure_date: str, return_date: str, cursor: str = "", max_stops: int = 0) -> Any:
+    if cursor:
+        # "Show more": the next page of an earlier search
+        return page_from_cursor(cursor)
+    origin_code = resolve_airport(origin)
+    destination_code = resolve_airport(destination)
     depart = parse_date(departure_date)
     ret = parse_date(return_date)
     if not depart or not ret:
         return {"error": "Could not parse one or both dates."}
-    valid = any(
-        r["origin"] == origin_code and r["destination"] == destination_code
-        for r in MOCK_ROUTES
-    )
-    if not valid:
+    routes = get_route_index()
+    max_stops = clamp_stops(max_stops)
+    # With max_stops the route graph looks for connections instead
+    if not max_stops and not routes.is_valid(origin_code, destination_code):
         return {
-            "error": "We currently only support mock routes from LAX to a few destinations.",
-            "supported_destinations": [r["destination"] for r in MOCK_ROUTES if r["origin"] == "LAX"]
+            "error": f"No direct route from {origin_code} to {destination_code}.",
+            "supported_destinations": list(routes.destinations_from(origin_code) or routes.destinations_from("LAX")),
+            "hint": "Search with max_stops=1 or 2 to include connecting flights."
         }
-    flights: List[Dict[str, Any]] = []
-    for i in range(1, 4):
-        price = round(random.uniform(300, 500), 2)
-        flights.append({
-            "id": str(i),
-            "origin": origin_code,
-            "destination": destination_code,
-            "departure_date": depart,
-            "return_date": ret,
-            "price": f"{price:.2f}",
-            "currency": "USD"
-        })
-    return flights
+    # Only the first page goes back into the workflow history and the prompt.
+    # Quotes are shared by the worker's threads, or by all workers on the host
+    # with QUOTE_CACHE_BACKEND=sqlite, so later pages and repeats keep their prices
+    return search_page((origin_code, destination_code, depart, ret, max_stops))
 
 # Book flight activity
 @activity.defn
-async def book_flight(flight_id: str, price: str) -> Any:
+async def book_flight(flight_id: str, price: str, quote_id: str = "") -> Any:
+    amount, error = charge_amount(price, quote_id)
+    if error:
+        return {"error": error}
+    # One charge keyed by the workflow and quote: a retried activity, or the
+    # same flight booked again in a session, returns the original charge
+    key = booking_key(activity.info().workflow_id, flight_id, quote_id, amount)
     try:
-        amount = int(float(price.replace('$', '')) * 100)
-    except ValueError:
-        return {"error": "Invalid price format."}
-    try:
-        customer = stripe.Customer.create(source="tok_visa")
-        charge = stripe.Charge.create(
-            amount=amount,
-            currency='usd',
-            description=f"Flight booking for {flight_id}",
-            customer=customer.id
-        )
+        charge = await get_booking_service().book_async(flight_id, amount, quote_id, idempotency_key=key)
         return {"receipt_url": charge.receipt_url}
     except Exception as e:
         return {"error": f"Stripe error: {str(e)}"}
 
+# Bulk booking activity
+@activity.defn
+async def book_flights_bulk(items: List[Dict[str, Any]]) -> Any:
+    # One activity for the whole group rather than one per seat, which would
+    # add three history events a seat. Item keys are scoped to the workflow,
+    # so a retried attempt gets back the charges it already made
+    return await book_flights_bulk_async(
+        items,
+        key_scope=activity.info().workflow_id,
+        progress=lambda done, total: activity.heartbeat(done, total),
+    )
+
+# Seat inventory activities: the workflow holds the seat, books, then
+# confirms the hold or releases it. The inventory is in-process, so the holds
+# of a booking must reach the worker that holds them: run one tool worker.
+@activity.defn
+def hold_seats(quote_id: str, count: int = 1) -> Any:
+    hold_id, error = seats.hold_seats(quote_id, activity.info().workflow_id, count)
+    return {"error": error} if error else {"hold_id": hold_id}
+
+@activity.defn
+def confirm_seats(hold_id: str) -> bool:
+    return seats.confirm_seats(hold_id)
+
+@activity.defn
+def release_seats(hold_id: str) -> bool:
+    return seats.release_seats(hold_id)
+
+# Price calendar activity
+@activity.defn
+def price_calendar(origin: str, destination: str, month: str, trip_length: int) -> Any:
+    # One vectorized pass over the month instead of a find_flights per date pair
+    return build_price_calendar(origin, destination, month, trip_length)
+
 # Tools
 @tool
-def find_flights_tool(origin: str, destination: str, departure_date: str, return_date: str) -> AgentAction:
-    """Plan the invocation for the find_flights activity."""
+def find_flights_tool(origin: str, destination: str, departure_date: str, return_date: str, cursor: str = "", max_stops: int = 0) -> AgentAction:
+    """Plan the invocation for the find_flights activity. Results come a page at a time; to show more, pass the next_cursor of the previous result as cursor. Set max_stops to 1 or 2 to include connecting flights, e.g. for destinations without a direct route."""
     return AgentAction(
         tool="find_flights_tool",
         tool_input={
             "origin": origin,
             "destination": destination,
             "departure_date": departure_date,
-            "return_date": return_date
+            "return_date": return_date,
+            "cursor": cursor,
+            "max_stops": max_stops
+        }
+    )
+
+@tool
+def find_flights_multi_tool(origin: str, destinations: List[str], date_pairs: List[List[str]]) -> AgentAction:
+    """Plan parallel find_flights searches over several destinations and [departure_date, return_date] pairs. Use it to compare or find the cheapest of several options in one step."""
+    return AgentAction(
+        tool="find_flights_multi_tool",
+        tool_input={
+            "origin": origin,
+            "destinations": destinations,
+            "date_pairs": date_pairs
         }
     )
 
 @tool
-def book_flight_tool(flight_id: str, price: str) -> AgentAction:
-    """Plan the invocation for the book_flight activity."""
+def book_flight_tool(flight_id: str, price: str, quote_id: str = "") -> AgentAction:
+    """Plan the invocation for the book_flight activity. Pass the quote_id of the chosen flight so the quoted price is charged."""
     return AgentAction(
         tool="book_flight_tool",
-        tool_input={"flight_id": flight_id, "price": price}
+        tool_input={"flight_id": flight_id, "price": price, "quote_id": quote_id}
     )
 
-TOOLS = [find_flights_tool, book_flight_tool]
+@tool
+def book_flights_bulk_tool(items: List[Dict[str, str]]) -> AgentAction:
+    """Plan the invocation for the book_flights_bulk activity: book seats for a group in one step, one item per passenger with passenger and the quote_id of the chosen flight. Returns every booking and every failed item."""
+    return AgentAction(
+        tool="book_flights_bulk_tool",
+        tool_input={"items": items}
+    )
+
+@tool
+def price_calendar_tool(origin: str, destination: str, month: str, trip_length: int) -> AgentAction:
+    """Plan the invocation for the price_calendar activity: the cheapest departure and return dates in a month (name or YYYY-MM) for a trip of about trip_length nights. Use it for flexible dates like "the cheapest week in June", then find_flights_tool on the chosen dates."""
+    return AgentAction(
+        tool="price_calendar_tool",
+        tool_input={
+            "origin": origin,
+            "destination": destination,
+            "month": month,
+            "trip_length": trip_length
+        }
+    )
+
+TOOLS = [find_flights_tool, find_flights_multi_tool, book_flight_tool, book_flights_bulk_tool, price_calendar_tool]
+
+# Tools resolve city names and typos to IATA codes (agent_tools.airports),
+# so the model passes places through as the user wrote them
+SYSTEM_PROMPT = "You are an airline assistant, specializing in finding trips from the Los Angeles area. Pass cities or airports to the tools as the user wrote them. Use tools when needed."
+
+# History goes in through placeholders, so the prompt is built once and
+# message content is never parsed as a template
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    MessagesPlaceholder("history"),
+    ("user", "{input}"),
+    MessagesPlaceholder("agent_scratchpad"),
+])
+
+# Tool-calling agent shared by every run_agent execution in this process
+_agent = None
+
+def build_agent():
+    """Create the tool-calling agent once, call at worker start to warm it up."""
+    global _agent
+    if _agent is None:
+        _agent = create_tool_calling_agent(llm=llm, tools=TOOLS, prompt=PROMPT)
+    return _agent
+
+def to_messages(history: List[Dict[str, Any]]) -> List[tuple[str, Any]]:
+    """Map workflow history events to LangChain (role, content) messages."""
+    messages: List[tuple[str, Any]] = []
+    for msg in history:
+        actor = msg.get("actor")
+        content = msg.get("message")
+        if actor == "user":
+            messages.append(("user", content))
+        elif actor == "llm":
+            messages.append(("assistant", content))
+        elif actor == "tool":
+            messages.append(("assistant", f"Observation: {serialize_result(content)}"))
+        elif actor == "summary":
+            # Compacted older turns, see history.py
+            messages.append(("system", f"Summary of the earlier conversation:\n{content}"))
+    return messages
 
 # LLM Conversation
 @activity.defn
@@ -122,39 +213,17 @@ async def run_agent(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if last_input is None:
         return []
 
-    # Map to LangChain roles
-    mapped_history: List[tuple[str, Any]] = []
-    for msg in history:
-        content = msg.get("message")
-        if msg.get("actor") == "user":
-            mapped_history.append(("user", content))
-        elif msg.get("actor") == "llm":
-            mapped_history.append(("assistant", content))
-        elif msg.get("actor") == "tool":
-            # Strip braces from observation
-            c = str(content).replace("{", "").replace("}", "")
-            mapped_history.append(("assistant", f"Observation: {c}"))
-
-    # Build prompts
-    prompt_content = [
-        ("system", "You are an airline assistant, specializing in finding trips from the Los Angeles area. You understand that users may refer to airports by city names or typos; normalize names like 'New York', 'New York City' to 'NYC' and 'Los Angeles' to 'LAX'. Use IATA codes for routing decisions. Use tools when needed.")
-    ] + mapped_history + [
-        ("user", last_input),
-        ("placeholder", "{agent_scratchpad}")
-    ]
-    prompt = ChatPromptTemplate.from_messages(prompt_content)
-    agent = create_tool_calling_agent(llm=llm, tools=TOOLS, prompt=prompt)
-
     # Invoke with all vars
-    result = agent.invoke({
+    usage = UsageMetadataCallbackHandler()
+    result = await build_agent().ainvoke({
+        "history": to_messages(history),
         "input": last_input,
         "intermediate_steps": [],
-        "error": "",
-        "agent_scratchpad": ""
-    })
+    }, config={"callbacks": [usage]})
+    record_token_usage(usage.usage_metadata)
 
     # Return LLM or tool event
     if isinstance(result, AgentFinish):
         return [{"actor": "llm", "message": result.return_values.get("output", "⚠️ No response")}]
     action = result[-1]
-    return [{"actor": "tool", "tool": action.tool, "tool_input": action.tool_input}]
\ No newline at end of file
+    return [{"actor": "tool", "tool": action.tool, "tool_input": action.tool_input}]
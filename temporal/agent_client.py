@@ -1,65 +1,133 @@
 from temporalio.client import Client, TLSConfig
+from temporalio.converter import DataConverter
 from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+from temporalio.service import RPCError
+from datetime import timedelta
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
+import asyncio
+import dataclasses
+import time
 import os
+from codec import CompressionCodec
 
 load_dotenv(override=True)
-async def get_client()-> Client:
 
-    if (
+# Shared client for this process, created on first use
+_client: Optional[Client] = None
+_client_lock: Optional[asyncio.Lock] = None
+_last_checked: float = 0.0
+
+@lru_cache(maxsize=1)
+def _tls_config() -> Optional[TLSConfig]:
+    """Read the mTLS cert and key once per process."""
+    if not (
         os.getenv("TEMPORAL_MTLS_TLS_CERT")
         and os.getenv("TEMPORAL_MTLS_TLS_KEY") is not None
     ):
-        server_root_ca_cert: Optional[bytes] = None
-        with open(os.getenv("TEMPORAL_MTLS_TLS_CERT"), "rb") as f:
-            client_cert = f.read()
+        return None
 
-        with open(os.getenv("TEMPORAL_MTLS_TLS_KEY"), "rb") as f:
-            client_key = f.read()
+    server_root_ca_cert: Optional[bytes] = None
+    with open(os.getenv("TEMPORAL_MTLS_TLS_CERT"), "rb") as f:
+        client_cert = f.read()
 
-        # Start client
-        client = await Client.connect(
-            os.getenv("TEMPORAL_HOST_URL"),
-            namespace=os.getenv("TEMPORAL_NAMESPACE"),
-            tls=TLSConfig(
-                server_root_ca_cert=server_root_ca_cert,
-                client_cert=client_cert,
-                client_private_key=client_key,
-            ),
-        )   
-    else:
-        client = await Client.connect(
-            "localhost:7233",
-        )
+    with open(os.getenv("TEMPORAL_MTLS_TLS_KEY"), "rb") as f:
+        client_key = f.read()
 
-    return client    
+    return TLSConfig(
+        server_root_ca_cert=server_root_ca_cert,
+        client_cert=client_cert,
+        client_private_key=client_key,
+    )
 
-async def get_worker_client()-> Client:
-    if (
-        os.getenv("TEMPORAL_MTLS_TLS_CERT")
-        and os.getenv("TEMPORAL_MTLS_TLS_KEY") is not None
-    ):
-        server_root_ca_cert: Optional[bytes] = None
-        with open(os.getenv("TEMPORAL_MTLS_TLS_CERT"), "rb") as f:
-            client_cert = f.read()
+@lru_cache(maxsize=1)
+def get_codec() -> Optional[CompressionCodec]:
+    """Payload compression set by TEMPORAL_PAYLOAD_CODEC (zlib or zstd), if any.
 
-        with open(os.getenv("TEMPORAL_MTLS_TLS_KEY"), "rb") as f:
-            client_key = f.read()
+    The codec keeps raw versus encoded byte counters, see CompressionCodec.stats().
+    """
+    algorithm = os.getenv("TEMPORAL_PAYLOAD_CODEC", "").strip().lower()
+    if not algorithm or algorithm == "none":
+        return None
+    return CompressionCodec(
+        algorithm=algorithm,
+        threshold=int(os.getenv("TEMPORAL_PAYLOAD_CODEC_THRESHOLD", "1024")),
+        level=int(os.getenv("TEMPORAL_PAYLOAD_CODEC_LEVEL", "6")),
+    )
 
-        # Start client
-        client = await Client.connect(
+@lru_cache(maxsize=1)
+def get_runtime() -> Runtime:
+    """Runtime exporting SDK and agent metrics for Prometheus on TEMPORAL_METRICS_PORT.
+
+    Every process (worker, UI) needs its own port. Without the variable the
+    default runtime is used and nothing is exported.
+    """
+    port = os.getenv("TEMPORAL_METRICS_PORT")
+    if not port:
+        return Runtime.default()
+    host = os.getenv("TEMPORAL_METRICS_HOST", "0.0.0.0")
+    return Runtime(
+        telemetry=TelemetryConfig(
+            metrics=PrometheusConfig(bind_address=f"{host}:{port}")
+        )
+    )
+
+def _data_converter() -> DataConverter:
+    codec = get_codec()
+    if codec is None:
+        return DataConverter.default
+    return dataclasses.replace(DataConverter.default, payload_codec=codec)
+
+async def _connect() -> Client:
+    tls = _tls_config()
+    if tls is not None:
+        return await Client.connect(
             os.getenv("TEMPORAL_HOST_URL"),
             namespace=os.getenv("TEMPORAL_NAMESPACE"),
-            tls=TLSConfig(
-                server_root_ca_cert=server_root_ca_cert,
-                client_cert=client_cert,
-                client_private_key=client_key,
-            ),
+            tls=tls,
+            data_converter=_data_converter(),
+            runtime=get_runtime(),
         )
-    else:
-        client = await Client.connect(
-            "localhost:7233",
+    return await Client.connect(
+        "localhost:7233",
+        data_converter=_data_converter(),
+        runtime=get_runtime(),
+    )
+
+async def _is_healthy(client: Client) -> bool:
+    """Whether the frontend still answers; False only when it cannot be reached."""
+    try:
+        return await client.service_client.check_health(
+            timeout=timedelta(seconds=float(os.getenv("TEMPORAL_HEALTH_CHECK_TIMEOUT", "2")))
         )
+    except (RPCError, ConnectionError):
+        return False
+
+async def get_client(check_health: bool = False) -> Client:
+    """Return the process-wide Temporal client, connecting on first use.
+
+    The connection is health checked at most every
+    TEMPORAL_HEALTH_CHECK_INTERVAL seconds (or right away with
+    ``check_health=True``) and replaced if the frontend stopped answering.
+    """
+    global _client, _client_lock, _last_checked
+
+    interval = float(os.getenv("TEMPORAL_HEALTH_CHECK_INTERVAL", "30"))
+    due = check_health or time.monotonic() - _last_checked > interval
+    if _client is not None and not due:
+        return _client
+
+    if _client_lock is None:
+        _client_lock = asyncio.Lock()
+
+    async with _client_lock:
+        if _client is not None and await _is_healthy(_client):
+            _last_checked = time.monotonic()
+            return _client
+        _client = await _connect()
+        _last_checked = time.monotonic()
+        return _client
 
-    return client    
\ No newline at end of file
+# Kept for existing imports, workers share the process-wide client
+get_worker_client = get_client
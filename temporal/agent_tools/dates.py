@@ -0,0 +1,95 @@
+import datetime
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+import dateparser
+
+# Fast, memoized date normalization for find_flights.
+#
+# Common formats are parsed with regular expressions, everything else falls
+# back to dateparser restricted to DATEPARSER_LANGUAGES. Results are cached
+# per (input, today) so relative dates like "next friday" roll over at
+# midnight.
+
+LANGUAGES = [lang.strip() for lang in os.getenv("DATEPARSER_LANGUAGES", "en").split(",") if lang.strip()]
+CACHE_SIZE = int(os.getenv("DATE_CACHE_SIZE", "4096"))
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10,
+    "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+RELATIVE_DAYS = {"today": 0, "tonight": 0, "tomorrow": 1}
+
+_ISO = re.compile(r"^(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:t[\d:.]+z?)?$")
+_US = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+_MONTH_DAY = re.compile(r"^([a-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?$")
+_DAY_MONTH = re.compile(r"^(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?([a-z]+)\.?(?:,?\s+(\d{4}))?$")
+_IN_DAYS = re.compile(r"^in\s+(\d{1,3})\s+(day|week)s?$")
+
+def parse_date(date_str: str) -> Optional[str]:
+    """Normalize a user supplied date to YYYY-MM-DD, preferring future dates."""
+    if not date_str:
+        return None
+    text = " ".join(str(date_str).strip().lower().split())
+    return _parse_cached(text, datetime.date.today())
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_cached(text: str, today: datetime.date) -> Optional[str]:
+    day = fast_parse(text, today)
+    if day is None:
+        dt = dateparser.parse(
+            text,
+            languages=LANGUAGES,
+            settings={
+                "PREFER_DATES_FROM": "future",
+                "RELATIVE_BASE": datetime.datetime.combine(today, datetime.datetime.now().time()),
+            }
+        )
+        if not dt:
+            return None
+        day = dt.date()
+    return day.strftime("%Y-%m-%d")
+
+def fast_parse(text: str, today: datetime.date) -> Optional[datetime.date]:
+    """Parse ISO, US and "June 5"/"5 June" style dates without dateparser."""
+    try:
+        m = _ISO.match(text)
+        if m:
+            return datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        m = _US.match(text)
+        if m:
+            return datetime.date(int(m.group(3)), int(m.group(1)), int(m.group(2)))
+        m = _MONTH_DAY.match(text)
+        if m and m.group(1) in MONTHS:
+            return _with_year(today, MONTHS[m.group(1)], int(m.group(2)), m.group(3))
+        m = _DAY_MONTH.match(text)
+        if m and m.group(2) in MONTHS:
+            return _with_year(today, MONTHS[m.group(2)], int(m.group(1)), m.group(3))
+    except ValueError:
+        # Out of range day or month, let dateparser have a go
+        return None
+    if text in RELATIVE_DAYS:
+        return today + datetime.timedelta(days=RELATIVE_DAYS[text])
+    m = _IN_DAYS.match(text)
+    if m:
+        days = int(m.group(1)) * (7 if m.group(2) == "week" else 1)
+        return today + datetime.timedelta(days=days)
+    return None
+
+def _with_year(today: datetime.date, month: int, day: int, year: Optional[str]) -> datetime.date:
+    if year:
+        return datetime.date(int(year), month, day)
+    # No year given: the next occurrence, like dateparser's PREFER_DATES_FROM=future
+    candidate = datetime.date(today.year, month, day)
+    if candidate < today:
+        candidate = datetime.date(today.year + 1, month, day)
+    return candidate
+
+def warm_up() -> None:
+    """Load dateparser's data for LANGUAGES up front so the first search is fast."""
+    for sample in ("next friday", "in two weeks", "June 5th"):
+        dateparser.parse(sample, languages=LANGUAGES)
@@ -0,0 +1,111 @@
+import hashlib
+from abc import ABC, abstractmethod
+import os
+import random
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+
+# Mock fares for searches without a fare inventory.
+#
+# FARE_GENERATOR picks how they are made: "seeded" (default) derives a
+# random.Random from (FARE_SEED, route, dates), so the same search gets the
+# same prices on every run and host and benchmark runs are comparable;
+# "random" gives different prices on every search;
+# "synthetic" is seeded too but yields SYNTHETIC_FARES fares per search,
+# with seats and durations, to stress ranking, serialization and the UIs
+# (raise SEARCH_MAX_RESULTS and SEARCH_PAGE_SIZE to send more to the UIs).
+
+MOCK_FLIGHTS = 3
+SYNTHETIC_FARES = 10_000
+
+class FareGenerator(ABC):
+    """Unranked mock fares for a search, in the find_flights shape."""
+
+    # Whether the same search always gets the same fares
+    repeatable = True
+
+    def __init__(self, count: int = MOCK_FLIGHTS):
+        self.count = count
+
+    @abstractmethod
+    def rng(self, origin: str, destination: str, depart: str, ret: str) -> random.Random:
+        """The random source of a search's fares."""
+
+    def fares(self, origin: str, destination: str, depart: str, ret: str) -> Iterator[Dict[str, Any]]:
+        rng = self.rng(origin, destination, depart, ret)
+        for _ in range(self.count):
+            yield _fare(origin, destination, depart, ret, rng.uniform(300, 500))
+
+    def cheapest(self, origin: str, destination: str, depart: str, ret: str) -> Optional[str]:
+        """The lowest price fares() gives the search, None if it gives none."""
+        return min((f["price"] for f in self.fares(origin, destination, depart, ret)), key=float, default=None)
+
+class RandomFareGenerator(FareGenerator):
+    """Different prices on every search, as find_flights always had."""
+
+    repeatable = False
+
+    def rng(self, origin: str, destination: str, depart: str, ret: str) -> random.Random:
+        # Seeded from the OS, like the global random module
+        return random.Random()
+
+class SeededFareGenerator(FareGenerator):
+    """The same prices for the same search and seed, on every run."""
+
+    def __init__(self, seed: int = 0, count: int = MOCK_FLIGHTS):
+        super().__init__(count)
+        self.seed = seed
+
+    def rng(self, origin: str, destination: str, depart: str, ret: str) -> random.Random:
+        # hashlib rather than hash(), which is salted per process for strings
+        raw = f"{self.seed}|{origin}|{destination}|{depart}|{ret}".encode("utf-8")
+        return random.Random(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big"))
+
+class SyntheticFareGenerator(SeededFareGenerator):
+    """Large, reproducible result sets around a per-route base fare."""
+
+    def __init__(self, seed: int = 0, count: int = SYNTHETIC_FARES):
+        super().__init__(seed, count)
+
+    def fares(self, origin: str, destination: str, depart: str, ret: str) -> Iterator[Dict[str, Any]]:
+        base = self.rng(origin, destination, "", "").uniform(150, 900)
+        rng = self.rng(origin, destination, depart, ret)
+        for _ in range(self.count):
+            fare = _fare(origin, destination, depart, ret, base * rng.uniform(0.7, 1.6))
+            minutes = rng.randrange(60, 18 * 60, 5)
+            fare["seats"] = rng.randrange(1, 10)
+            fare["duration"] = f"{minutes // 60}h {minutes % 60:02d}m"
+            yield fare
+
+    def cheapest(self, origin: str, destination: str, depart: str, ret: str) -> Optional[str]:
+        # Same draws as fares(), without building the fares
+        base = self.rng(origin, destination, "", "").uniform(150, 900)
+        rng = self.rng(origin, destination, depart, ret)
+        low = None
+        for _ in range(self.count):
+            factor = rng.uniform(0.7, 1.6)
+            rng.randrange(60, 18 * 60, 5)
+            rng.randrange(1, 10)
+            if low is None or factor < low:
+                low = factor
+        return None if low is None else f"{base * low:.2f}"
+
+def _fare(origin: str, destination: str, depart: str, ret: str, price: float) -> Dict[str, Any]:
+    return {
+        "origin": origin,
+        "destination": destination,
+        "departure_date": depart,
+        "return_date": ret,
+        "price": f"{price:.2f}",
+    }
+
+@lru_cache(maxsize=1)
+def get_fare_generator() -> FareGenerator:
+    """The process-wide generator configured by FARE_GENERATOR and FARE_SEED."""
+    kind = os.getenv("FARE_GENERATOR", "seeded")
+    seed = int(os.getenv("FARE_SEED", "0"))
+    if kind == "random":
+        return RandomFareGenerator()
+    if kind == "synthetic":
+        return SyntheticFareGenerator(seed, int(os.getenv("SYNTHETIC_FARES", str(SYNTHETIC_FARES))))
+    return SeededFareGenerator(seed)
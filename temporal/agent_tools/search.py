@@ -0,0 +1,95 @@
+import base64
+import heapq
+import json
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from agent_tools.fare_generator import get_fare_generator
+from agent_tools.fares import get_fare_inventory, to_day
+from agent_tools.quotes import SearchKey, get_quote_cache
+from agent_tools.records import Flight
+from agent_tools.route_graph import connecting_flights
+from agent_tools.routes import get_route_index
+from agent_tools.seats import with_availability
+
+# Ranked, paginated flight search behind find_flights.
+#
+# Candidate fares are streamed from the fare inventory (or the fare generator),
+# plus connecting itineraries from the route graph when max_stops allows, and
+# only the SEARCH_MAX_RESULTS cheapest are kept in a bounded heap. Those
+# are cached as quotes, and find_flights returns them SEARCH_PAGE_SIZE at a
+# time with a next_cursor for "show more", so the LLM only ever sees one page
+# however many flights match. Every flight on the page carries the seats
+# still free in the seat inventory (agent_tools.seats).
+
+PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "3"))
+MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "30"))
+
+def candidate_flights(origin: str, destination: str, depart: str, ret: str, k: int, max_stops: int = 0) -> Iterator[Dict[str, Any]]:
+    """Unranked fares for a search, at most k per inventory chunk."""
+    if max_stops:
+        yield from connecting_flights(origin, destination, depart, ret, max_stops, k)
+    if not get_route_index().is_valid(origin, destination):
+        return
+    inventory = get_fare_inventory()
+    if inventory is not None:
+        yield from inventory.iter_fares(origin, destination, to_day(depart), return_from=to_day(ret), limit=k)
+        return
+    yield from get_fare_generator().fares(origin, destination, depart, ret)
+
+def stream_flights(
+    origin: str,
+    destination: str,
+    depart: str,
+    ret: str,
+    max_stops: int = 0,
+    k: int = MAX_RESULTS,
+) -> Iterator[Flight]:
+    """Yield the k cheapest flights of a search, cheapest first, numbered from 1."""
+    candidates = candidate_flights(origin, destination, depart, ret, k, max_stops)
+    ranked = heapq.nsmallest(k, candidates, key=lambda f: float(f["price"]))
+    for i, flight in enumerate(ranked, start=1):
+        yield Flight.from_dict({**flight, "id": str(i)})
+
+def encode_cursor(key: SearchKey, offset: int) -> str:
+    raw = json.dumps(list(key) + [offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Optional[Tuple[SearchKey, int]]:
+    """The search and offset of a cursor, or None if it is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        *key, offset = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if (
+        len(key) != 5
+        or not all(isinstance(k, str) for k in key[:4])
+        or not isinstance(key[4], int)
+        or not isinstance(offset, int)
+        or offset < 0
+    ):
+        return None
+    return tuple(key), offset
+
+def search_page(key: SearchKey, offset: int = 0, page_size: int = PAGE_SIZE) -> Dict[str, Any]:
+    """One page of a search's ranked quotes, with a next_cursor if there are more."""
+    quotes = get_quote_cache()
+    flights = quotes.get(key)
+    if flights is None:
+        flights = list(stream_flights(*key))
+        if not flights:
+            return {"error": "No fares available for that route and dates."}
+        flights = quotes.put(key, flights)
+    page = with_availability(flights[offset:offset + page_size])
+    result: Dict[str, Any] = {"flights": [f.to_dict() for f in page]}
+    if offset + page_size < len(flights):
+        result["next_cursor"] = encode_cursor(key, offset + page_size)
+    return result
+
+def page_from_cursor(cursor: str) -> Dict[str, Any]:
+    """The page a next_cursor points at ("show more")."""
+    decoded = decode_cursor(cursor)
+    if decoded is None:
+        return {"error": "Invalid cursor, please search again."}
+    return search_page(*decoded)
@@ -0,0 +1,284 @@
+import hashlib
+import heapq
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from agent_tools.quotes import get_quote_cache
+from agent_tools.records import Flight
+
+# Seat inventory shared by find_flights and book_flight.
+#
+# Seats are counted per fare (route, dates, price and connections, see
+# fare_key), out of the fare's seats or SEAT_CAPACITY. Every quote of a fare
+# shares its seats, whichever search (e.g. direct or with max_stops) found
+# it. A booking holds its seats, charges, then confirms the hold,
+# or releases it if the charge failed, so two sessions can never both buy
+# the last seat. A hold lasts SEAT_HOLD_TTL seconds: a background reaper
+# returns expired seats every SEAT_REAPER_INTERVAL seconds, and a hold that
+# finds too few seats sweeps its own flight first.
+#
+# Flights are spread over SEAT_LOCK_STRIPES locks by hash, each with its own
+# flights and counters, so holds on unrelated flights never wait for each
+# other and the reaper only ever locks one stripe at a time. The inventory
+# lives in the process, like the memory quote cache: Temporal holds and
+# confirms must run on the same tool worker.
+
+CAPACITY = int(os.getenv("SEAT_CAPACITY", "9"))
+HOLD_TTL = float(os.getenv("SEAT_HOLD_TTL", "300"))
+REAPER_INTERVAL = float(os.getenv("SEAT_REAPER_INTERVAL", "5"))
+STRIPES = int(os.getenv("SEAT_LOCK_STRIPES", "64"))
+# A charge that outlived its hold on a flight that sold out meanwhile
+SEAT_LOST = "Charged, but the seat hold expired and the flight sold out meanwhile."
+
+@dataclass(frozen=True)
+class SeatHold:
+    hold_id: str
+    flight: str
+    session_id: str
+    seats: int
+    expires_at: float
+
+@dataclass
+class _FlightSeats:
+    capacity: int
+    sold: int = 0
+    held: int = 0
+    holds: Dict[str, SeatHold] = field(default_factory=dict)
+    # Confirmed hold ids, so a retried confirm succeeds again
+    confirmed: Set[str] = field(default_factory=set)
+
+class _Stripe:
+    __slots__ = ("lock", "flights", "expiries", "stats")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights: Dict[str, _FlightSeats] = {}
+        # (expires_at, flight, hold_id) of every hold, soonest first, so the
+        # reaper only visits holds that are due; confirmed and released ones
+        # are skipped when they come up
+        self.expiries: List[Tuple[float, str, str]] = []
+        self.stats = {"holds": 0, "conflicts": 0, "confirmed": 0, "released": 0, "expired": 0}
+
+class SeatInventory:
+    """Seat holds and sales per flight, with one lock per stripe of flights."""
+
+    def __init__(
+        self,
+        stripes: int = STRIPES,
+        ttl: float = HOLD_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.clock = clock
+        self._stripes = [_Stripe() for _ in range(max(1, stripes))]
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def available(self, flight: str, capacity: int) -> int:
+        """Seats neither sold nor held on a flight."""
+        stripe = self._stripe(flight)
+        with stripe.lock:
+            seats = stripe.flights.get(flight)
+            if seats is None:
+                return capacity
+            self._expire(stripe, seats, self.clock())
+            return max(0, seats.capacity - seats.sold - seats.held)
+
+    def hold(self, flight: str, session_id: str, capacity: int, seats: int = 1) -> Optional[SeatHold]:
+        """Hold seats on a flight, or None if too few are left.
+
+        A session holds a flight at most once, under the same hold_id:
+        holding it again returns the live or confirmed hold, so a retried
+        step or a repeated booking (which Stripe does not charge twice
+        either) takes no more seats.
+        """
+        hold_id = f"{flight}:{hashlib.blake2b(session_id.encode('utf-8'), digest_size=8).hexdigest()}"
+        stripe = self._stripe(flight)
+        now = self.clock()
+        with stripe.lock:
+            entry = stripe.flights.get(flight)
+            if entry is None:
+                entry = stripe.flights[flight] = _FlightSeats(capacity)
+            held = entry.holds.get(hold_id)
+            if held is not None:
+                if held.expires_at >= now:
+                    return held
+                self._expire(stripe, entry, now)
+            if hold_id in entry.confirmed:
+                return SeatHold(hold_id, flight, session_id, seats, now + self.ttl)
+            if entry.capacity - entry.sold - entry.held < seats:
+                # The reaper may not have been by yet
+                self._expire(stripe, entry, now)
+                if entry.capacity - entry.sold - entry.held < seats:
+                    stripe.stats["conflicts"] += 1
+                    return None
+            held = SeatHold(hold_id, flight, session_id, seats, now + self.ttl)
+            entry.holds[held.hold_id] = held
+            entry.held += seats
+            heapq.heappush(stripe.expiries, (held.expires_at, flight, hold_id))
+            stripe.stats["holds"] += 1
+            return held
+
+    def confirm(self, hold_id: str, capacity: int = CAPACITY) -> bool:
+        """Turn a hold into sold seats; False if it expired and the seats are gone.
+
+        capacity is only needed when the reaper has dropped the flight since.
+        """
+        flight = hold_id.rpartition(":")[0]
+        stripe = self._stripe(flight)
+        with stripe.lock:
+            entry = stripe.flights.get(flight)
+            if entry is None:
+                entry = stripe.flights[flight] = _FlightSeats(capacity)
+            if hold_id in entry.confirmed:
+                return True
+            held = entry.holds.pop(hold_id, None)
+            if held is not None:
+                entry.held -= held.seats
+                seats = held.seats
+            else:
+                # Expired while the charge ran: sell it anyway if a seat is left
+                seats = 1
+                if entry.capacity - entry.sold - entry.held < seats:
+                    stripe.stats["conflicts"] += 1
+                    return False
+            entry.sold += seats
+            entry.confirmed.add(hold_id)
+            stripe.stats["confirmed"] += 1
+            return True
+
+    def release(self, hold_id: str) -> bool:
+        """Give a hold's seats back, e.g. after a failed charge."""
+        flight = hold_id.rpartition(":")[0]
+        stripe = self._stripe(flight)
+        with stripe.lock:
+            entry = stripe.flights.get(flight)
+            held = entry.holds.pop(hold_id, None) if entry else None
+            if held is None:
+                return False
+            entry.held -= held.seats
+            stripe.stats["released"] += 1
+            self._forget_if_unused(stripe, flight, entry)
+            return True
+
+    def reap(self) -> int:
+        """Expire the holds that are due, one stripe at a time."""
+        expired = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                now = self.clock()
+                while stripe.expiries and stripe.expiries[0][0] < now:
+                    _, flight, hold_id = heapq.heappop(stripe.expiries)
+                    entry = stripe.flights.get(flight)
+                    held = entry.holds.get(hold_id) if entry else None
+                    if held is None or held.expires_at >= now:
+                        continue
+                    del entry.holds[hold_id]
+                    entry.held -= held.seats
+                    stripe.stats["expired"] += 1
+                    expired += 1
+                    self._forget_if_unused(stripe, flight, entry)
+        return expired
+
+    def start_reaper(self, interval: float = REAPER_INTERVAL) -> None:
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_every, args=(interval,), daemon=True)
+            self._reaper.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+
+    def stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {"flights": 0, "held": 0, "sold": 0}
+        for stripe in self._stripes:
+            with stripe.lock:
+                for name, count in stripe.stats.items():
+                    totals[name] = totals.get(name, 0) + count
+                totals["flights"] += len(stripe.flights)
+                totals["held"] += sum(entry.held for entry in stripe.flights.values())
+                totals["sold"] += sum(entry.sold for entry in stripe.flights.values())
+        return totals
+
+    def _stripe(self, flight: str) -> _Stripe:
+        return self._stripes[hash(flight) % len(self._stripes)]
+
+    def _expire(self, stripe: _Stripe, entry: _FlightSeats, now: float) -> int:
+        expired = [hold_id for hold_id, held in entry.holds.items() if held.expires_at < now]
+        for hold_id in expired:
+            entry.held -= entry.holds.pop(hold_id).seats
+        stripe.stats["expired"] += len(expired)
+        return len(expired)
+
+    def _forget_if_unused(self, stripe: _Stripe, flight: str, entry: _FlightSeats) -> None:
+        if not entry.holds and not entry.sold:
+            del stripe.flights[flight]
+
+    def _reap_every(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.reap()
+
+def seat_capacity(flight: Flight) -> int:
+    """Seats on a flight: the fare's seats when it has them, else SEAT_CAPACITY."""
+    return flight.seats if flight.seats is not None else CAPACITY
+
+def fare_key(flight: Flight) -> str:
+    """The inventory key of a fare, the same for every quote of it.
+
+    It ends in the fare's capacity, so a confirm can recount a flight the
+    reaper has dropped since its hold.
+    """
+    raw = "|".join((
+        flight.origin,
+        flight.destination,
+        flight.departure_date,
+        flight.return_date,
+        flight.price,
+        ",".join(flight.via),
+        ",".join(f"{leg.get('origin')}{leg.get('depart')}" for leg in flight.legs),
+    ))
+    return f"F{hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()}/{seat_capacity(flight)}"
+
+def hold_seats(quote_id: str, session_id: str, seats: int = 1) -> Tuple[str, Optional[str]]:
+    """Hold seats on a quoted flight: (hold_id, None), or ("", error).
+
+    Without a quote_id there is no flight to count seats on, and nothing is
+    held; confirm_seats and release_seats accept the empty hold_id.
+    """
+    if not quote_id:
+        return "", None
+    flight = get_quote_cache().get_quote(quote_id)
+    if flight is None:
+        return "", "Quote expired or unknown, please search again."
+    held = get_seat_inventory().hold(fare_key(flight), session_id, seat_capacity(flight), seats)
+    if held is None:
+        return "", "Sold out: no seats left on this flight, please pick another."
+    return held.hold_id, None
+
+def confirm_seats(hold_id: str) -> bool:
+    """Sell held seats; False if the hold expired and the flight sold out."""
+    if not hold_id:
+        return True
+    capacity = hold_id.rpartition(":")[0].rpartition("/")[2]
+    return get_seat_inventory().confirm(hold_id, int(capacity) if capacity.isdigit() else CAPACITY)
+
+def release_seats(hold_id: str) -> bool:
+    return not hold_id or get_seat_inventory().release(hold_id)
+
+def with_availability(flights: List[Flight]) -> List[Flight]:
+    """The flights with seats set to the seats still free."""
+    inventory = get_seat_inventory()
+    return [f.replace(seats=inventory.available(fare_key(f), seat_capacity(f))) for f in flights]
+
+@lru_cache(maxsize=1)
+def get_seat_inventory() -> SeatInventory:
+    """The process-wide inventory, its reaper started on first use."""
+    inventory = SeatInventory()
+    inventory.start_reaper()
+    return inventory
@@ -0,0 +1,146 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# History management for AgentWorkflow. Everything here runs inside the
+# workflow, so it must stay deterministic: no clocks, randomness or I/O.
+
+@dataclass
+class HistoryConfig:
+    # Events kept verbatim and sent to the planner
+    window: int = 20
+    # Lines of older conversation kept in the running summary
+    summary_lines: int = 20
+    # Continue-as-new once the workflow event history reaches either limit
+    max_events: int = 2000
+    max_bytes: int = 4 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "HistoryConfig":
+        """Build a config from AGENT_HISTORY_* variables, for workflow starters."""
+        return cls(
+            window=int(os.getenv("AGENT_HISTORY_WINDOW", cls.window)),
+            summary_lines=int(os.getenv("AGENT_HISTORY_SUMMARY_LINES", cls.summary_lines)),
+            max_events=int(os.getenv("AGENT_HISTORY_MAX_EVENTS", cls.max_events)),
+            max_bytes=int(os.getenv("AGENT_HISTORY_MAX_BYTES", cls.max_bytes)),
+        )
+
+@dataclass
+class SessionState:
+    """Conversation state carried from one workflow run to the next."""
+    config: HistoryConfig = field(default_factory=HistoryConfig)
+    # Rolling window of recent events
+    history: List[Dict[str, Any]] = field(default_factory=list)
+    # Plain-text summary of the events that left the window
+    summary: List[str] = field(default_factory=list)
+    # Number of events folded into the summary so far
+    compacted: int = 0
+    # User messages received but not processed yet
+    pending: List[str] = field(default_factory=list)
+    # Task queue for find_flights/book_flight, None runs them on the workflow's queue
+    tool_task_queue: Optional[str] = None
+    # find_flights activities running at once for a multi-destination search
+    fanout_concurrency: int = 5
+
+def summarize_event(event: Dict[str, Any]) -> Optional[str]:
+    """One summary line for an event, or None if it is not worth keeping."""
+    actor = event.get("actor")
+    content = event.get("message")
+    if actor == "user":
+        return f"User: {_truncate(content)}"
+    if actor == "llm":
+        return f"Assistant: {_truncate(content)}"
+    if actor == "tool":
+        # Planning stubs are implied by the result that follows them
+        if isinstance(content, dict) and "tool" in content and "input" in content:
+            return None
+        more = ""
+        if isinstance(content, dict) and "flights" in content:
+            # One page of a search, next_cursor fetches the rest
+            if content.get("next_cursor"):
+                more = f" (more: cursor {content['next_cursor']})"
+            content = content["flights"]
+        if isinstance(content, list) and content:
+            first = content[0]
+            trips = {(f.get("destination"), f.get("departure_date"), f.get("return_date")) for f in content}
+            if len(trips) > 1:
+                # Multi-destination search, keep the trip on every flight
+                prices = ", ".join(
+                    f"#{f.get('id')} {f.get('destination')} {f.get('departure_date')} to "
+                    f"{f.get('return_date')} ${f.get('price')}{_quote(f)}"
+                    for f in content
+                )
+                return f"Found flights from {first.get('origin')}: {prices}{more}"
+            prices = ", ".join(f"#{f.get('id')} ${f.get('price')}{_quote(f)}" for f in content)
+            return (
+                f"Found flights {first.get('origin')}->{first.get('destination')} "
+                f"{first.get('departure_date')} to {first.get('return_date')}: {prices}{more}"
+            )
+        if isinstance(content, dict) and "cheapest" in content:
+            dates = ", ".join(
+                f"{c.get('departure_date')} to {c.get('return_date')} ${c.get('price')}"
+                for c in content["cheapest"]
+            )
+            return (
+                f"Price calendar {content.get('origin')}->{content.get('destination')} "
+                f"{content.get('month')}: {dates}"
+            )
+        if isinstance(content, dict):
+            if "error" in content:
+                return f"Tool error: {_truncate(content['error'])}"
+            fields = ", ".join(f"{k}={v}" for k, v in sorted(content.items()))
+            return f"Tool result: {_truncate(fields)}"
+    return None
+
+def _quote(flight: Dict[str, Any]) -> str:
+    # Keep connections and quote ids so a summarized search can still be booked
+    via = f" via {'/'.join(flight['via'])}" if flight.get("via") else ""
+    return via + (f" quote {flight['quote_id']}" if flight.get("quote_id") else "")
+
+def compact(state: SessionState) -> int:
+    """Fold events beyond the rolling window into the summary.
+
+    Returns the number of events removed from the window.
+    """
+    overflow = len(state.history) - state.config.window
+    if overflow <= 0:
+        return 0
+    for event in state.history[:overflow]:
+        line = summarize_event(event)
+        if line:
+            state.summary.append(line)
+    del state.history[:overflow]
+    del state.summary[:-state.config.summary_lines]
+    state.compacted += overflow
+    return overflow
+
+def planner_history(state: SessionState) -> List[Dict[str, Any]]:
+    """History to send to the planner: the summary followed by the window."""
+    if not state.summary:
+        return list(state.history)
+    return [{"actor": "summary", "message": "\n".join(state.summary)}] + state.history
+
+def events_since(state: SessionState, offset: int) -> Dict[str, Any]:
+    """Events after absolute position ``offset`` plus the cursor for the next call.
+
+    Positions count every event of the session, including the ones already
+    compacted away, so a cursor stays valid across compaction and
+    continue-as-new. ``start`` is the position of the first returned event and
+    is greater than ``offset`` when older events were compacted before they
+    were read.
+    """
+    start = max(offset, state.compacted)
+    return {
+        "events": state.history[start - state.compacted:],
+        "start": start,
+        "cursor": state.compacted + len(state.history),
+    }
+
+def payload_size(value: Any) -> int:
+    """Approximate encoded size in bytes of an activity argument or result."""
+    return len(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+def _truncate(text: Any, limit: int = 200) -> str:
+    text = str(text)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
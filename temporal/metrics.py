@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+from typing import Any, Dict
+
+from temporalio import activity, workflow
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    Interceptor,
+)
+
+# Custom agent metrics, exported next to the SDK metrics on the Prometheus
+# endpoint configured in agent_client. The meters already carry namespace,
+# task_queue and activity_type or workflow_type attributes.
+
+class ActivityMetricsInterceptor(Interceptor):
+    """Record a latency histogram for every activity the worker runs."""
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ActivityLatencyInbound(next)
+
+class _ActivityLatencyInbound(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        start = time.monotonic()
+        status = "failed"
+        try:
+            result = await super().execute_activity(input)
+            status = "completed"
+            return result
+        finally:
+            activity.metric_meter().with_additional_attributes({"status": status}).create_histogram_timedelta(
+                "agent_activity_latency",
+                "Wall time of agent activity executions",
+                "ms",
+            ).record(timedelta(seconds=time.monotonic() - start))
+
+def record_token_usage(usage: Dict[str, Dict[str, Any]]) -> None:
+    """Count prompt and completion tokens from LangChain usage metadata, per model."""
+    meter = activity.metric_meter()
+    for model, counts in usage.items():
+        model_meter = meter.with_additional_attributes({"model": model})
+        model_meter.create_counter(
+            "agent_llm_prompt_tokens", "LLM prompt tokens", "tokens"
+        ).add(int(counts.get("input_tokens", 0)))
+        model_meter.create_counter(
+            "agent_llm_completion_tokens", "LLM completion tokens", "tokens"
+        ).add(int(counts.get("output_tokens", 0)))
+
+def record_history_size(window_events: int, turn_payload_bytes: int) -> None:
+    """Report the history size of the current workflow after a turn."""
+    info = workflow.info()
+    meter = workflow.metric_meter().with_additional_attributes({"workflow_id": info.workflow_id})
+    meter.create_gauge(
+        "agent_history_window_events", "Events in the rolling history window"
+    ).set(window_events)
+    meter.create_gauge(
+        "agent_workflow_history_events", "Events in the Temporal workflow history"
+    ).set(info.get_current_history_length())
+    meter.create_gauge(
+        "agent_workflow_history_bytes", "Size of the Temporal workflow history", "bytes"
+    ).set(info.get_current_history_size())
+    workflow.metric_meter().create_histogram(
+        "agent_turn_payload_bytes", "Activity payload bytes per turn", "bytes"
+    ).record(turn_payload_bytes)
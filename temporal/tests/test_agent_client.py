@@ -0,0 +1,57 @@
+"""Run from temporal/: python -m unittest discover tests"""
+import unittest
+from unittest import mock
+
+from temporalio.service import RPCError, RPCStatusCode
+
+import agent_client
+
+
+class FakeServiceClient:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.timeouts = []
+
+    async def check_health(self, *, timeout=None) -> bool:
+        # The bridge calls timeout.total_seconds()
+        self.timeouts.append(timeout.total_seconds())
+        if self.error:
+            raise self.error
+        return True
+
+
+class FakeClient:
+    def __init__(self, error: Exception | None = None):
+        self.service_client = FakeServiceClient(error)
+
+
+class GetClientTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(agent_client, _client=None, _client_lock=None, _last_checked=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_healthy_client_is_reused_across_health_checks(self):
+        healthy = FakeClient()
+        agent_client._client = healthy
+        with mock.patch.object(agent_client, "_connect") as connect:
+            self.assertIs(await agent_client.get_client(check_health=True), healthy)
+            self.assertIs(await agent_client.get_client(check_health=True), healthy)
+        connect.assert_not_called()
+        self.assertEqual(healthy.service_client.timeouts, [2.0, 2.0])
+
+    async def test_unreachable_frontend_reconnects(self):
+        agent_client._client = FakeClient(RPCError("unreachable", RPCStatusCode.UNAVAILABLE, b""))
+        fresh = FakeClient()
+        with mock.patch.object(agent_client, "_connect", return_value=fresh) as connect:
+            self.assertIs(await agent_client.get_client(check_health=True), fresh)
+        connect.assert_awaited_once()
+
+    async def test_health_check_bugs_are_not_hidden(self):
+        agent_client._client = FakeClient(TypeError("bad argument"))
+        with self.assertRaises(TypeError):
+            await agent_client.get_client(check_health=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from agent_tools.airports import AIRPORTS_FILE, AirportResolver
+
+
+class AirportResolverTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.resolver = AirportResolver.from_file(AIRPORTS_FILE, {"LAX", "NYC", "MUC", "SFO", "CDG", "ORD"})
+
+    def test_names_prefixes_and_typos_resolve(self):
+        for text, code in (
+            ("New York", "NYC"), ("München", "MUC"), ("san fran", "SFO"),
+            ("Denv", "DEN"), ("New Yrok", "NYC"), ("mimai", "MIA"), ("lax", "LAX"),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(self.resolver.lookup(text), code)
+
+    def test_words_that_are_not_airports_do_not_resolve(self):
+        for text in ("Atlantis", "Mars", "Narnia", "Gotham", "Hogwarts", "xyzzy"):
+            with self.subTest(text=text):
+                self.assertIsNone(self.resolver.lookup(text))
+
+    def test_codes_only_match_exactly(self):
+        self.assertIsNone(self.resolver.lookup("LXA"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import datetime
+import unittest
+
+from activities import find_flights
+from agent_tools.fare_generator import get_fare_generator
+from agent_tools.fares import get_fare_inventory
+from agent_tools.price_calendar import price_calendar
+
+
+@unittest.skipIf(get_fare_inventory() is not None, "prices come from the fare inventory")
+class MockPriceCalendarTest(unittest.TestCase):
+    def test_calendar_prices_match_find_flights(self):
+        month = (datetime.date.today().replace(day=1) + datetime.timedelta(days=62)).strftime("%Y-%m")
+        result = price_calendar("LAX", "NYC", month, 6)
+        self.assertNotIn("note", result)
+        for cell in result["cheapest"]:
+            flights = find_flights("LAX", "NYC", cell["departure_date"], cell["return_date"])["flights"]
+            self.assertEqual(cell["price"], min(flights, key=lambda f: float(f["price"]))["price"])
+
+    def test_calendar_is_cheapest_of_its_month(self):
+        month = (datetime.date.today().replace(day=1) + datetime.timedelta(days=62)).strftime("%Y-%m")
+        result = price_calendar("LAX", "NYC", month, 6)
+        cheapest = result["cheapest"][0]
+        depart = datetime.date.fromisoformat(cheapest["departure_date"])
+        for nights in result["nights"]:
+            ret = (depart + datetime.timedelta(days=nights)).isoformat()
+            fares = get_fare_generator().fares("LAX", "NYC", depart.isoformat(), ret)
+            self.assertGreaterEqual(min(float(f["price"]) for f in fares), float(cheapest["price"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,16 @@
 import os
 import uuid
-import asyncio
 import gradio as gr
 from temporalio.client import Client, WorkflowHandle
+from temporalio.service import RPCError
 from workflows import AgentWorkflow
-from agent_client import get_client  # async def get_client() -> Client
+from history import HistoryConfig, SessionState
+from agent_client import get_client  # shared, lazily connected Client
 
 WORKFLOW_ID = "agent-session-" + str(uuid.uuid4())
 workflow_handle: WorkflowHandle | None = None
+# Position in each session's event stream the UI has already seen
+session_cursors: dict[str, int] = {}
 
 # Welcome
 WELCOME_TEXT = (
@@ -17,70 +20,126 @@ WELCOME_TEXT = (
     "return dates. I'll find you the best routes and prices available."
 )
 
+def render_event(msg) -> str:
+    """Format a workflow history event as an assistant chat message."""
+    actor = msg.get("actor")
+    content = msg.get("message")
+
+    # Skip planning stubs if tool
+    if (
+        actor == "tool"
+        and isinstance(content, dict)
+        and "tool" in content
+        and ("input" in content or "tool_input" in content)
+    ):
+        return ""
+
+    # Flight list, one page at a time
+    if actor == "tool" and isinstance(content, dict) and "flights" in content:
+        lines = ["✈️ I found the following flights:"]
+        for f in content["flights"]:
+            lines.append(
+                f"- Flight {f['id']}: {f['origin']}→{f['destination']}, "
+                f"{f['departure_date']}→{f['return_date']} at ${f['price']}"
+                + (f" via {', '.join(f['via'])} ({f['duration']})" if f.get("via") else "")
+            )
+        if content.get("next_cursor"):
+            lines.append("Ask to see more flights for further options.")
+        return "\n".join(lines)
+
+    # Price calendar
+    if actor == "tool" and isinstance(content, dict) and "cheapest" in content:
+        lines = [f"📅 Cheapest dates {content['origin']}→{content['destination']} in {content['month']}:"]
+        for c in content["cheapest"]:
+            lines.append(f"- {c['departure_date']}→{c['return_date']} ({c['nights']} nights) from ${c['price']}")
+        return "\n".join(lines)
+
+    # Group booking, every passenger's invoice and every failed item
+    if actor == "tool" and isinstance(content, dict) and "bookings" in content:
+        lines = [f"✅ Booked {content['booked']} of {content['booked'] + content['failed']} "
+                 f"passengers, ${content['charged']} charged:"]
+        for b in content["bookings"]:
+            lines.append(f"- {b['passenger']}: flight {b['flight_id']}, invoice: {b['invoice_url']}"
+                         + (f" ({b['warning']})" if b.get("warning") else ""))
+        for e in content["errors"]:
+            lines.append(f"- ❌ Item {e['item']} ({e['passenger'] or 'no passenger'}): {e['error']}")
+        return "\n".join(lines)
+
+    # Booking confirmation
+    if actor == "tool" and isinstance(content, dict):
+        if "receipt_url" in content:
+            return f"✅ Your booking is confirmed! Receipt: {content['receipt_url']}"
+        return content.get("error", str(content))
+
+    # LLM reply
+    if actor == "llm":
+        return content
+
+    return ""
+
+def latest_reply(events) -> str:
+    """Render the most recent displayable event of a turn."""
+    for msg in reversed(events):
+        text = render_event(msg)
+        if text:
+            return text
+    return ""
+
+def finished(events) -> bool:
+    """Whether the turn completed the workflow: a booking, or a fully booked group."""
+    for e in events:
+        content = e.get("message")
+        if e.get("actor") == "tool" and isinstance(content, dict) and (
+            "receipt_url" in content or ("bookings" in content and content.get("status") == "success")
+        ):
+            return True
+    return False
+
 async def chat_agent(user_message, history):
     global workflow_handle, WORKFLOW_ID
 
     client: Client = await get_client()
 
-    # Start or signal the workflow
+    # Start the workflow for a new session
     if workflow_handle is None:
         workflow_handle = await client.start_workflow(
             AgentWorkflow.run,
+            SessionState(
+                config=HistoryConfig.from_env(),
+                tool_task_queue=os.getenv("TEMPORAL_TOOL_TASK_QUEUE") or None,
+                fanout_concurrency=int(os.getenv("AGENT_FANOUT_CONCURRENCY", "5")),
+            ),
             id=WORKFLOW_ID,
             task_queue=os.getenv("TEMPORAL_TASK_QUEUE", "airline-agent"),
-            start_signal="user_message",
-            start_signal_args=[user_message],
         )
-    else:
-        await workflow_handle.signal("user_message", user_message)
-
-    # Wait for ready
-    while not await workflow_handle.query("is_ready"):
-        await asyncio.sleep(0.5)
-
-    # Fetch history
-    conv = await workflow_handle.query("get_history")
-    assistant_message = ""
-
-    for msg in reversed(conv):
-        actor = msg.get("actor")
-        content = msg.get("message")
-
-        # Skip planning stubs if tool
-        if (
-            actor == "tool"
-            and isinstance(content, dict)
-            and "tool" in content
-            and ("input" in content or "tool_input" in content)
-        ):
-            continue
-
-        # Flight list
-        if actor == "tool" and isinstance(content, list):
-            lines = ["✈️ I found the following flights:"]
-            for f in content:
-                lines.append(
-                    f"- Flight {f['id']}: {f['origin']}→{f['destination']}, "
-                    f"{f['departure_date']}→{f['return_date']} at ${f['price']}"
-                )
-            assistant_message = "\n".join(lines)
-            break
-
-        # Booking confirmation
-        if actor == "tool" and isinstance(content, dict):
-            if "receipt_url" in content:
-                assistant_message = f"✅ Your booking is confirmed! Receipt: {content['receipt_url']}"
-                # Reset session for new booking
-                workflow_handle = None
-                WORKFLOW_ID = "agent-session-" + str(uuid.uuid4())
-            else:
-                assistant_message = content.get("error", str(content))
-            break
-
-        # LLM reply
-        if actor == "llm":
-            assistant_message = content
-            break
+
+    # Run the turn and wait for its result in a single round trip
+    update_id = str(uuid.uuid4())
+    try:
+        result = await workflow_handle.execute_update(
+            AgentWorkflow.submit_turn, user_message, id=update_id
+        )
+    except RPCError:
+        # Reconnect and retry once, the update id keeps the turn from running twice
+        client = await get_client(check_health=True)
+        workflow_handle = client.get_workflow_handle(WORKFLOW_ID)
+        result = await workflow_handle.execute_update(
+            AgentWorkflow.submit_turn, user_message, id=update_id
+        )
+
+    # Only new events come back, fetch the gap if another client added some
+    cursor = session_cursors.get(WORKFLOW_ID, 0)
+    if result["start"] > cursor:
+        result = await workflow_handle.query(AgentWorkflow.get_events_since, cursor)
+    session_cursors[WORKFLOW_ID] = result["cursor"]
+    events = result["events"]
+    assistant_message = latest_reply(events)
+
+    if finished(events):
+        # The workflow is done, reset session for new booking
+        session_cursors.pop(WORKFLOW_ID, None)
+        workflow_handle = None
+        WORKFLOW_ID = "agent-session-" + str(uuid.uuid4())
 
     return {"text": assistant_message}
 
@@ -1,22 +1,76 @@
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from temporalio.worker import Worker
 from workflows import AgentWorkflow
-from activities import find_flights, book_flight, run_agent
-from agent_client import get_worker_client
+from activities import (
+    find_flights, book_flight, book_flights_bulk, price_calendar, hold_seats, confirm_seats, release_seats,
+    run_agent, build_agent,
+)
+from agent_client import get_client
+from metrics import ActivityMetricsInterceptor
+from agent_tools.dates import warm_up
+
+# Planner (LLM) activities are async and run on the event loop
+MAX_CONCURRENT_ACTIVITIES = int(os.getenv("TEMPORAL_MAX_CONCURRENT_ACTIVITIES", "100"))
+# Tool activities are sync and each one holds a thread while it runs
+TOOL_THREADS = int(os.getenv("TEMPORAL_TOOL_THREADS", "20"))
+TOOL_ACTIVITIES = [
+    find_flights, book_flight, book_flights_bulk, price_calendar, hold_seats, confirm_seats, release_seats,
+]
 
 
 async def main():
-    client = await get_worker_client()
+    client = await get_client()
+    # Compile the LLM agent once, every run_agent call reuses it
+    build_agent()
+    # Load the date parser's locale data before the first search
+    warm_up()
+
+    task_queue = os.getenv("TEMPORAL_TASK_QUEUE")
+    # A separate tool queue keeps slow Stripe calls from starving planner calls
+    tool_task_queue = os.getenv("TEMPORAL_TOOL_TASK_QUEUE") or task_queue
+
+    # On a shared queue any activity slot may end up running a sync tool
+    threads = TOOL_THREADS if tool_task_queue != task_queue else max(TOOL_THREADS, MAX_CONCURRENT_ACTIVITIES)
+
+    # Activity latency histograms for every worker below
+    interceptors = [ActivityMetricsInterceptor()]
 
-    worker = Worker(
-        client,
-        task_queue=os.getenv("TEMPORAL_TASK_QUEUE"),
-        workflows=[AgentWorkflow],
-        activities=[find_flights, book_flight, run_agent]
-    )
-    await worker.run()
+    with ThreadPoolExecutor(max_workers=threads) as tool_executor:
+        if tool_task_queue == task_queue:
+            workers = [
+                Worker(
+                    client,
+                    task_queue=task_queue,
+                    workflows=[AgentWorkflow],
+                    activities=[*TOOL_ACTIVITIES, run_agent],
+                    activity_executor=tool_executor,
+                    max_concurrent_activities=MAX_CONCURRENT_ACTIVITIES,
+                    interceptors=interceptors,
+                )
+            ]
+        else:
+            workers = [
+                Worker(
+                    client,
+                    task_queue=task_queue,
+                    workflows=[AgentWorkflow],
+                    activities=[run_agent],
+                    max_concurrent_activities=MAX_CONCURRENT_ACTIVITIES,
+                    interceptors=interceptors,
+                ),
+                Worker(
+                    client,
+                    task_queue=tool_task_queue,
+                    activities=TOOL_ACTIVITIES,
+                    activity_executor=tool_executor,
+                    max_concurrent_activities=TOOL_THREADS,
+                    interceptors=interceptors,
+                ),
+            ]
+        await asyncio.gather(*(worker.run() for worker in workers))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -1,103 +1,316 @@
+import asyncio
 from temporalio import workflow
 from datetime import timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 with workflow.unsafe.imports_passed_through():
     from activities import (
         run_agent,
         find_flights,
-        book_flight
+        book_flight,
+        book_flights_bulk,
+        price_calendar,
+        hold_seats,
+        confirm_seats,
+        release_seats
     )
+    from agent_tools.seats import SEAT_LOST
+    from history import SessionState, compact, events_since, planner_history, payload_size
+    from metrics import record_history_size
+
+# Number of recent turns kept for the payload size stats
+STATS_TURNS = 50
+# Most find_flights searches a single multi-destination request may start
+MAX_FANOUT_SEARCHES = 24
+# A bulk booking heartbeats after every item, a stuck one is retried
+BULK_HEARTBEAT_TIMEOUT = timedelta(seconds=30)
+BULK_BOOKING_TIMEOUT = timedelta(minutes=10)
+SEAT_TIMEOUT = timedelta(seconds=10)
 
 # Agent Workflow
 @workflow.defn
 class AgentWorkflow:
     def __init__(self):
-        # Pending user messages
-        self._pending: List[str] = []
-        # Full conversation history
-        self.history: List[Dict[str, Any]] = []
+        # Rolling history window, summary and pending user messages
+        self.state = SessionState()
+        # Activity payload bytes of recent turns
+        self._turn_bytes: List[int] = []
         # Ready flag for UI polling
         self.ready: bool = True
+        # Set once a booking completes and the session is over
+        self._done: bool = False
+        # One turn at a time, whether it arrived as a signal or an update
+        self._turn_lock = asyncio.Lock()
+
+    @property
+    def history(self) -> List[Dict[str, Any]]:
+        return self.state.history
+
+    @property
+    def _pending(self) -> List[str]:
+        return self.state.pending
 
     @workflow.run
-    async def run(self):
-        while True:
-            # Wait for next user turn
-            await workflow.wait_condition(lambda: len(self._pending) > 0)
-            user_msg = self._pending.pop(0)
-
-            self.ready = False
-            self.history.append({"actor": "user", "message": user_msg})
-
-            # Get planner decision
-            events = await workflow.execute_activity(
-                run_agent,
-                args=(self.history,),
-                start_to_close_timeout=timedelta(seconds=30),
+    async def run(self, state: Optional[SessionState] = None):
+        if state is not None:
+            # Resume a session carried over by continue-as-new
+            self.state = state
+
+        while not self._done:
+            # Wait for next user turn, or for the event history to fill up
+            await workflow.wait_condition(
+                lambda: len(self._pending) > 0 or self._done or self._history_full()
             )
-            evt = events[0]
-
-            if evt.get("actor") == "tool":
-                tool_name = evt["tool"]
-                tool_input = evt.get("tool_input", {})
-
-                # Record the plan
-                self.history.append({
-                    "actor": "tool",
-                    "message": {"tool": tool_name, "input": tool_input}
-                })
-
-                # Execute Tool via activity
-                if tool_name == "find_flights_tool":
-                    obs = await workflow.execute_activity(
-                        find_flights,
-                        args=(
-                            tool_input["origin"],
-                            tool_input["destination"],
-                            tool_input["departure_date"],
-                            tool_input["return_date"],
-                        ),
-                        schedule_to_close_timeout=timedelta(seconds=30),
-                    )
-                    # Record the flights list
-                    self.history.append({"actor": "tool", "message": obs})
-
-                    # Get an LLM follow-up and continue
-                    llm_events = await workflow.execute_activity(
-                        run_agent,
-                        args=(self.history,),
-                        start_to_close_timeout=timedelta(seconds=30),
-                    )
-                    for e in llm_events:
-                        self.history.append(e)
+            if self._pending:
+                user_msg = self._pending.pop(0)
+                async with self._turn_lock:
+                    await self._run_turn(user_msg)
+            elif not self._done:
+                # Finish running turns, then start a fresh run with the compacted state
+                await workflow.wait_condition(workflow.all_handlers_finished)
+                compact(self.state)
+                workflow.logger.info(
+                    "Continuing as new after %d events, %d compacted",
+                    workflow.info().get_current_history_length(),
+                    self.state.compacted,
+                )
+                workflow.continue_as_new(self.state)
+
+        # Let in-flight submit_turn updates return their result before completing
+        await workflow.wait_condition(workflow.all_handlers_finished)
+
+    def _history_full(self) -> bool:
+        info = workflow.info()
+        return (
+            info.is_continue_as_new_suggested()
+            or info.get_current_history_length() >= self.state.config.max_events
+            or info.get_current_history_size() >= self.state.config.max_bytes
+        )
+
+    async def _plan(self) -> List[Dict[str, Any]]:
+        """Ask the planner for the next events given the compacted history."""
+        compact(self.state)
+        history = planner_history(self.state)
+        events = await workflow.execute_activity(
+            run_agent,
+            args=(history,),
+            start_to_close_timeout=timedelta(seconds=30),
+        )
+        self._turn_bytes[-1] += payload_size(history) + payload_size(events)
+        return events
+
+    async def _run_turn(self, user_msg: str) -> Dict[str, Any]:
+        """Run one planner -> tool -> follow-up cycle and return the last event."""
+        self.ready = False
+        self.history.append({"actor": "user", "message": user_msg})
+        self._turn_bytes.append(0)
+        del self._turn_bytes[:-STATS_TURNS]
 
-                elif tool_name == "book_flight_tool":
-                    obs = await workflow.execute_activity(
-                        book_flight,
-                        args=(
-                            tool_input["flight_id"],
-                            tool_input["price"],
-                        ),
-                        schedule_to_close_timeout=timedelta(seconds=30),
-                    )
-                    # Record booking result
-                    self.history.append({"actor": "tool", "message": obs})
+        # Get planner decision
+        events = await self._plan()
+        evt = events[0]
 
+        if evt.get("actor") == "tool":
+            tool_name = evt["tool"]
+            tool_input = evt.get("tool_input", {})
+
+            # Record the plan
+            self.history.append({
+                "actor": "tool",
+                "message": {"tool": tool_name, "input": tool_input}
+            })
+
+            # Execute Tool via activity
+            if tool_name == "find_flights_tool":
+                obs = await workflow.execute_activity(
+                    find_flights,
+                    args=(
+                        tool_input["origin"],
+                        tool_input["destination"],
+                        tool_input["departure_date"],
+                        tool_input["return_date"],
+                        tool_input.get("cursor", ""),
+                        tool_input.get("max_stops", 0),
+                    ),
+                    schedule_to_close_timeout=timedelta(seconds=30),
+                    task_queue=self.state.tool_task_queue,
+                )
+                # Record the first page of flights
+                self.history.append({"actor": "tool", "message": obs})
+                self._turn_bytes[-1] += payload_size(tool_input) + payload_size(obs)
+
+                # Get an LLM follow-up and continue
+                llm_events = await self._plan()
+                for e in llm_events:
+                    self.history.append(e)
+
+            elif tool_name == "find_flights_multi_tool":
+                obs = await self._search_many(tool_input)
+                # Record the merged, ranked flights list
+                self.history.append({"actor": "tool", "message": obs})
+                self._turn_bytes[-1] += payload_size(tool_input) + payload_size(obs)
+
+                # Get an LLM follow-up and continue
+                llm_events = await self._plan()
+                for e in llm_events:
+                    self.history.append(e)
+
+            elif tool_name == "price_calendar_tool":
+                obs = await workflow.execute_activity(
+                    price_calendar,
+                    args=(
+                        tool_input["origin"],
+                        tool_input["destination"],
+                        tool_input["month"],
+                        tool_input["trip_length"],
+                    ),
+                    schedule_to_close_timeout=timedelta(seconds=30),
+                    task_queue=self.state.tool_task_queue,
+                )
+                # Record the cheapest dates
+                self.history.append({"actor": "tool", "message": obs})
+                self._turn_bytes[-1] += payload_size(tool_input) + payload_size(obs)
+
+                # Get an LLM follow-up and continue
+                llm_events = await self._plan()
+                for e in llm_events:
+                    self.history.append(e)
+
+            elif tool_name == "book_flight_tool":
+                obs = await self._book_seat(tool_input)
+                # Record booking result
+                self.history.append({"actor": "tool", "message": obs})
+                self._turn_bytes[-1] += payload_size(tool_input) + payload_size(obs)
+
+                if "receipt_url" in obs:
                     # Complete workflow after booking
-                    self.ready = True
-                    return
+                    self._done = True
+                else:
+                    # Sold out or declined: let the user pick another flight
+                    llm_events = await self._plan()
+                    for e in llm_events:
+                        self.history.append(e)
+
+            elif tool_name == "book_flights_bulk_tool":
+                obs = await workflow.execute_activity(
+                    book_flights_bulk,
+                    args=(tool_input.get("items", []),),
+                    start_to_close_timeout=BULK_BOOKING_TIMEOUT,
+                    heartbeat_timeout=BULK_HEARTBEAT_TIMEOUT,
+                    task_queue=self.state.tool_task_queue,
+                )
+                # Record the consolidated result, bookings and failed items
+                self.history.append({"actor": "tool", "message": obs})
+                self._turn_bytes[-1] += payload_size(tool_input) + payload_size(obs)
 
+                # Complete workflow once the group is booked, let the user
+                # retry the failed items of a partial booking
+                if obs.get("status") == "success":
+                    self._done = True
                 else:
-                    # Tool unknown
-                    obs = {"error": f"Unknown tool: {tool_name}"}
-                    self.history.append({"actor": "tool", "message": obs})
+                    llm_events = await self._plan()
+                    for e in llm_events:
+                        self.history.append(e)
 
             else:
-                # LLM reply
-                self.history.append(evt)
+                # Tool unknown
+                obs = {"error": f"Unknown tool: {tool_name}"}
+                self.history.append({"actor": "tool", "message": obs})
+
+        else:
+            # LLM reply
+            self.history.append(evt)
+
+        workflow.logger.info(
+            "Turn payload %d bytes, %d events in window, %d compacted",
+            self._turn_bytes[-1], len(self.history), self.state.compacted,
+        )
+        record_history_size(len(self.history), self._turn_bytes[-1])
+        self.ready = True
+        return self.history[-1]
+
+    async def _book_seat(self, tool_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Hold a seat, charge, then confirm the hold or release it."""
+        quote_id = tool_input.get("quote_id", "")
+        hold = await workflow.execute_activity(
+            hold_seats,
+            args=(quote_id, 1),
+            schedule_to_close_timeout=SEAT_TIMEOUT,
+            task_queue=self.state.tool_task_queue,
+        )
+        if "error" in hold:
+            return hold
+        obs = await workflow.execute_activity(
+            book_flight,
+            args=(tool_input["flight_id"], tool_input.get("price", ""), quote_id),
+            schedule_to_close_timeout=timedelta(seconds=30),
+            task_queue=self.state.tool_task_queue,
+        )
+        settle = release_seats if "error" in obs else confirm_seats
+        seated = await workflow.execute_activity(
+            settle,
+            args=(hold["hold_id"],),
+            schedule_to_close_timeout=SEAT_TIMEOUT,
+            task_queue=self.state.tool_task_queue,
+        )
+        if settle is confirm_seats and not seated:
+            obs = {**obs, "warning": SEAT_LOST}
+        return obs
+
+    async def _search_many(self, tool_input: Dict[str, Any]) -> Any:
+        """Fan out find_flights over destinations x date pairs and rank the results."""
+        searches = [
+            (destination, pair[0], pair[1])
+            for destination in tool_input.get("destinations", [])
+            for pair in tool_input.get("date_pairs", [])
+            if len(pair) == 2
+        ][:MAX_FANOUT_SEARCHES]
+        if not searches:
+            return {"error": "Give at least one destination and one [departure, return] date pair."}
+
+        semaphore = asyncio.Semaphore(max(1, self.state.fanout_concurrency))
 
-            self.ready = True
+        async def search(destination: str, depart: str, ret: str) -> Any:
+            async with semaphore:
+                return await workflow.execute_activity(
+                    find_flights,
+                    args=(tool_input["origin"], destination, depart, ret),
+                    schedule_to_close_timeout=timedelta(seconds=30),
+                    task_queue=self.state.tool_task_queue,
+                )
+
+        results = await asyncio.gather(*(search(*s) for s in searches))
+
+        flights: List[Dict[str, Any]] = []
+        errors: List[str] = []
+        for (destination, _, _), result in zip(searches, results):
+            if isinstance(result, dict) and "flights" in result:
+                flights.extend(result["flights"])
+            elif isinstance(result, dict) and "error" in result:
+                errors.append(f"{destination}: {result['error']}")
+        if not flights:
+            return {"error": "No flights found. " + " ".join(errors)}
+
+        # Cheapest first, renumbered so ids stay unique across searches
+        flights.sort(key=lambda f: float(f["price"]))
+        return {"flights": [{**f, "id": str(i)} for i, f in enumerate(flights, start=1)]}
+
+    @workflow.update
+    async def submit_turn(self, msg: str) -> Dict[str, Any]:
+        """Run a full turn for a user message and return the events it added.
+
+        The result has the same shape as get_events_since, starting at the
+        user message of this turn.
+        """
+        async with self._turn_lock:
+            start = self.state.compacted + len(self.history)
+            await self._run_turn(msg)
+            return events_since(self.state, start)
+
+    @submit_turn.validator
+    def validate_submit_turn(self, msg: str) -> None:
+        if self._done:
+            raise ValueError("Session is complete, start a new workflow.")
 
     @workflow.signal
     def user_message(self, msg: str) -> None:
@@ -106,10 +319,28 @@ class AgentWorkflow:
 
     @workflow.query
     def get_history(self) -> List[Dict[str, Any]]:
-        """Retrieve the full conversation history."""
+        """Retrieve the recent conversation history (the rolling window)."""
         return self.history
 
+    @workflow.query
+    def get_events_since(self, offset: int) -> Dict[str, Any]:
+        """Retrieve only the events after a cursor returned by an earlier call."""
+        return events_since(self.state, offset)
+
+    @workflow.query
+    def get_stats(self) -> Dict[str, Any]:
+        """Report history size and activity payload bytes of recent turns."""
+        info = workflow.info()
+        return {
+            "window_events": len(self.history),
+            "compacted_events": self.state.compacted,
+            "summary_lines": len(self.state.summary),
+            "workflow_history_events": info.get_current_history_length(),
+            "workflow_history_bytes": info.get_current_history_size(),
+            "turn_payload_bytes": list(self._turn_bytes),
+        }
+
     @workflow.query
     def is_ready(self) -> bool:
         """Check if the workflow is ready for the next user message."""
-        return self.ready
\ No newline at end of file
+        return self.ready